@@ -1,23 +1,34 @@
 import os
 import json
+import base64
 import uuid
 import logging
 import math
 import sys
+import functools
 from datetime import datetime
 from werkzeug.utils import secure_filename
-from werkzeug.exceptions import RequestEntityTooLarge
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_from_directory, Response
-from memory_storage import memory_storage
+from werkzeug.exceptions import RequestEntityTooLarge, RequestedRangeNotSatisfiable
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_from_directory, Response, session, make_response
+from http_validators import ValidatorClock, weak_etag
+from leaderboard import Leaderboard, RankingSync, TrendingBoard, parse_weights
+from page_cache import PageCache
+from search_index import tokenize
+from storage_backend import create_storage
+from view_counter import ViewCounter
+from view_models import post_view, video_view
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 
+# Backend chosen by STORAGE_BACKEND (memory, sqlite or vercel_blob)
+storage = create_storage()
+
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET",
                                 "skibidi_sigma_ohio_rizz_2024")
 # Configuration - no longer using local file storage
-# All files are stored in memory as base64 encoded data
+# All files are stored in memory as raw bytes
 
 # VERCEL PAYLOAD LIMITS - Critical for deployment
 VERCEL_MAX_PAYLOAD = 3 * 1024 * 1024  # 3MB Vercel limit
@@ -33,6 +44,34 @@ ALLOWED_EXTENSIONS = {
 VIDEO_EXTENSIONS = {'mp4', 'webm', 'mov', 'avi'}
 POSTS_PER_PAGE = 10  # Pagination
 COMMENTS_PER_PAGE = 5  # Comments pagination
+COMMENT_PREVIEW_SIZE = 3  # Newest comments embedded per post in the feed
+UPLOAD_CACHE_MAX_AGE = 365 * 24 * 60 * 60  # 1 year for immutable uploads
+VIEW_FLUSH_INTERVAL = float(os.environ.get('VIEW_FLUSH_INTERVAL', '10'))  # seconds between view count writes
+PAGE_CACHE_SIZE = int(os.environ.get('PAGE_CACHE_SIZE', '128'))  # rendered pages kept in memory
+API_PAGE_SIZE = 50  # Default posts per /api/posts page
+API_MAX_PAGE_SIZE = 200  # Largest page a client may ask for
+HALL_SIZE = int(os.environ.get('HALL_SIZE', '10'))  # Posts shown in each hall
+# Score per like/comment; a post enters a hall once its score is above zero
+HALL_OF_FAME_WEIGHTS = parse_weights(os.environ.get('HALL_OF_FAME_WEIGHTS', 'likes=3,comments=2'))
+HALL_OF_SHAME_WEIGHTS = parse_weights(os.environ.get('HALL_OF_SHAME_WEIGHTS', 'comments=1,likes=-2'))
+TRENDING_SIZE = int(os.environ.get('TRENDING_SIZE', '50'))  # Videos in the trending feed
+TRENDING_WEIGHTS = parse_weights(os.environ.get('TRENDING_WEIGHTS', 'likes=5,views=1'))
+TRENDING_HALF_LIFE = float(os.environ.get('TRENDING_HALF_LIFE_HOURS', '24')) * 60 * 60  # seconds
+
+# Rendered HTML of read-heavy pages, valid while their collections are unchanged
+page_cache = PageCache(max_entries=PAGE_CACHE_SIZE)
+
+# Per-route times of the current ETags, sent as Last-Modified
+validator_clock = ValidatorClock()
+
+# Live hall rankings, updated on every like and comment
+halls = {
+    'hall_of_fame': Leaderboard(HALL_SIZE, HALL_OF_FAME_WEIGHTS),
+    'hall_of_shame': Leaderboard(HALL_SIZE, HALL_OF_SHAME_WEIGHTS),
+}
+
+# Videos ranked by likes and views decayed with age, updated on every like and view
+trending = TrendingBoard(TRENDING_SIZE, TRENDING_WEIGHTS, TRENDING_HALF_LIFE)
 
 app.config['MAX_CONTENT_LENGTH'] = VERCEL_MAX_PAYLOAD
 
@@ -85,8 +124,7 @@ def check_maintenance_mode():
             return None
         return render_template('maintenance.html'), 503
 
-# Initialize in-memory storage
-logging.info("Using in-memory storage with backup functionality")
+logging.info(f"Using {type(storage).__name__} storage backend")
 if os.environ.get('BACKUP_URL'):
     logging.info(f"Backup URL configured: {os.environ.get('BACKUP_URL')}")
 else:
@@ -103,84 +141,148 @@ def allowed_file(filename):
 
 
 def load_posts():
-    """Load all posts from memory storage"""
+    """Load all posts from memory storage (newest first, no copy)"""
     try:
-        posts = memory_storage.get_data('posts', [])
-        # Sort by timestamp descending (newest first)
-        return sorted(posts,
-                      key=lambda x: x.get('timestamp', ''),
-                      reverse=True)
+        # Storage keeps posts in timestamp order, so this is a cheap view
+        return storage.get_ordered('posts')
     except Exception as e:
         logging.error(f"Error loading posts: {e}")
         return []
 
 
-def load_comments():
-    """Load all comments from Vercel blob storage"""
-    try:
-        data = memory_storage.get_data('comments', {})
-        # Ensure data is a dictionary, not a list
-        if isinstance(data, list):
-            logging.warning("Comments data is a list, converting to empty dict")
-            return {}
-        return data
-    except Exception as e:
-        logging.error(f"Error loading comments: {e}")
-        return {}
+def post_engagement(post, likes, comments):
+    """Engagement counts a post's hall scores are computed from"""
+    return {
+        'likes': likes.count(post['id']),
+        'comments': comments.count(post['id'])
+    }
+
+
+def storage_generation(key):
+    """Storage generation of one collection, for ranking sync"""
+    return storage.generation(key)
+
+
+def rebuild_halls():
+    """Rank every post in both halls from one bulk read of likes and comments"""
+    # Posts nobody engaged with score zero, so they aren't read at all
+    records = list(storage.engagement('posts', ('likes', 'comments')).items())
+    for board in halls.values():
+        board.rebuild(records)
+
 
+# Rebuilds the halls on first use and after other workers' likes or comments
+hall_sync = RankingSync(('likes', 'comments'), storage_generation, rebuild_halls)
 
-def load_likes():
-    """Load all likes from Vercel blob storage"""
+
+def update_halls(post_id):
+    """Re-rank one post in both halls after its likes or comments changed"""
     try:
-        data = memory_storage.get_data('likes', {})
-        # Ensure data is a dictionary, not a list
-        if isinstance(data, list):
-            logging.warning("Likes data is a list, converting to empty dict")
-            return {}
-        return data
+        post = storage.get_record('posts', post_id)
+        # Video likes share the likes store but are not ranked
+        if post is not None:
+            counts = post_engagement(post, storage.likes, storage.comments)
+            for board in halls.values():
+                board.update(post_id, counts)
     except Exception as e:
-        logging.error(f"Error loading likes: {e}")
-        return {}
+        logging.error(f"Error updating halls for {post_id}: {e}")
 
 
-def load_hall_of_fame():
-    """Load hall of fame posts from Vercel blob storage"""
+def load_hall(name):
+    """Load the ranked posts of a hall, best first"""
     try:
-        return memory_storage.get_data('hall_of_fame', [])
+        hall_sync.ensure()
+        posts = []
+        for post_id, _ in halls[name].top():
+            post = storage.get_record('posts', post_id)
+            if post is not None:
+                posts.append(post)
+        return posts
     except Exception as e:
-        logging.error(f"Error loading hall of fame: {e}")
+        logging.error(f"Error loading {name}: {e}")
         return []
 
 
-def load_hall_of_shame():
-    """Load hall of shame posts from Vercel blob storage"""
+def trending_counts(video_id, timestamp, likes, views):
+    """Engagement counts and upload time a video's trending score is computed from"""
     try:
-        return memory_storage.get_data('hall_of_shame', [])
+        created = datetime.fromisoformat(timestamp).timestamp()
+    except ValueError:
+        created = 0
+    return {
+        'likes': likes,
+        # Unflushed views count at once, so trending reacts between flushes
+        'views': views + view_counter.pending(video_id),
+        'created': created
+    }
+
+
+def video_engagement(video, likes):
+    """Trending counts of one stored video"""
+    return trending_counts(video['id'], video.get('timestamp', ''), likes.count(video['id']), video.get('views', 0))
+
+
+def rebuild_trending():
+    """Rank every video from one bulk read of likes and views"""
+    # Videos nobody liked or viewed score zero, so they aren't read at all
+    engaged = storage.engagement('videos', ('likes', 'views'))
+    # ...unless their only views haven't been flushed yet
+    for video_id in set(view_counter.pending_ids()) - engaged.keys():
+        video = storage.get_record('videos', video_id)
+        if video is not None:
+            engaged[video_id] = {'timestamp': video.get('timestamp', ''), 'likes': 0, 'views': 0}
+    trending.rebuild([(video_id, trending_counts(video_id, counts['timestamp'], counts['likes'], counts['views']))
+                      for video_id, counts in engaged.items()])
+
+
+# Rebuilds trending on first use and after other workers' video or like writes
+trending_sync = RankingSync(('videos', 'likes'), storage_generation, rebuild_trending)
+
+
+def update_trending(video_id):
+    """Re-rank one video after its likes or views changed"""
+    try:
+        video = storage.get_record('videos', video_id)
+        # Post likes share the likes store but are not ranked here
+        if video is not None:
+            trending.update(video_id, video_engagement(video, storage.likes))
     except Exception as e:
-        logging.error(f"Error loading hall of shame: {e}")
-        return []
+        logging.error(f"Error updating trending for {video_id}: {e}")
 
 
-def load_videos():
-    """Load all videos from Vercel blob storage"""
+def load_trending_videos():
+    """Load the top trending videos, best first"""
     try:
-        videos = memory_storage.get_data('videos', [])
-        # Sort by timestamp descending (newest first)
-        return sorted(videos,
-                      key=lambda x: x.get('timestamp', ''),
-                      reverse=True)
+        trending_sync.ensure()
+        videos = []
+        for video_id, _ in trending.top():
+            video = storage.get_record('videos', video_id)
+            if video is not None:
+                videos.append(video)
+        return videos
     except Exception as e:
-        logging.error(f"Error loading videos: {e}")
+        logging.error(f"Error loading trending videos: {e}")
         return []
 
 
-def save_videos(videos):
-    """Save videos to Vercel blob storage"""
+def load_hall_of_fame():
+    """Load the most liked and discussed posts"""
+    return load_hall('hall_of_fame')
+
+
+def load_hall_of_shame():
+    """Load the most ratioed posts: plenty of comments, few likes"""
+    return load_hall('hall_of_shame')
+
+
+def load_videos():
+    """Load all videos from memory storage (newest first, no copy)"""
     try:
-        return memory_storage.set_data('videos', videos)
+        # Storage keeps videos in timestamp order, so this is a cheap view
+        return storage.get_ordered('videos')
     except Exception as e:
-        logging.error(f"Error saving videos: {e}")
-        return False
+        logging.error(f"Error loading videos: {e}")
+        return []
 
 
 def create_video(username, title, description, filename):
@@ -195,11 +297,11 @@ def create_video(username, title, description, filename):
         'views': 0
     }
 
-    videos = load_videos()
-    videos.append(video)
-
-    if save_videos(videos):
-        return video
+    # Unranked until it is liked or viewed, so there is nothing to update
+    with trending_sync.local_write() as writes:
+        if storage.insert_ordered('videos', video):
+            writes['videos'] += 1
+            return video
     return None
 
 
@@ -209,33 +311,6 @@ def allowed_video_file(filename):
            filename.rsplit('.', 1)[1].lower() in VIDEO_EXTENSIONS
 
 
-def save_posts(posts):
-    """Save posts to Vercel blob storage"""
-    try:
-        return memory_storage.set_data('posts', posts)
-    except Exception as e:
-        logging.error(f"Error saving posts: {e}")
-        return False
-
-
-def save_comments(comments):
-    """Save comments to Vercel blob storage"""
-    try:
-        return memory_storage.set_data('comments', comments)
-    except Exception as e:
-        logging.error(f"Error saving comments: {e}")
-        return False
-
-
-def save_likes(likes):
-    """Save likes to Vercel blob storage"""
-    try:
-        return memory_storage.set_data('likes', likes)
-    except Exception as e:
-        logging.error(f"Error saving likes: {e}")
-        return False
-
-
 def create_post(username, content, filename=None):
     """Create a new post"""
     post = {
@@ -249,10 +324,7 @@ def create_post(username, content, filename=None):
         'comments': []
     }
 
-    posts = load_posts()
-    posts.append(post)
-
-    if save_posts(posts):
+    if storage.insert_ordered('posts', post):
         return post
     return None
 
@@ -266,31 +338,22 @@ def add_comment(post_id, username, comment_content):
         'timestamp': datetime.now().isoformat()
     }
 
-    comments = load_comments()
-    if post_id not in comments:
-        comments[post_id] = []
-    comments[post_id].append(comment)
-
-    if save_comments(comments):
-        return comment
-    return None
+    with hall_sync.local_write() as writes:
+        if not storage.add_comment(post_id, comment):
+            return None
+        writes['comments'] += 1
+        update_halls(post_id)
+    return comment
 
 
 def toggle_like(post_id, username):
     """Toggle like for a post by username"""
-    likes = load_likes()
-    if post_id not in likes:
-        likes[post_id] = []
-
-    if username in likes[post_id]:
-        likes[post_id].remove(username)
-        action = 'unliked'
-    else:
-        likes[post_id].append(username)
-        action = 'liked'
-
-    save_likes(likes)
-    return action, len(likes[post_id])
+    with hall_sync.local_write() as writes, trending_sync.local_write(writes):
+        result = storage.toggle_like(post_id, username)
+        writes['likes'] += 1
+        update_halls(post_id)
+        update_trending(post_id)
+    return result
 
 
 def toggle_video_like(video_id, username):
@@ -304,6 +367,11 @@ def search_posts(query):
     if not query:
         return posts
 
+    # Word queries go through the inverted index (prefix match per word)
+    if tokenize(query):
+        return storage.search('posts', query)
+
+    # Queries without any word characters (e.g. emoji) fall back to a scan
     query_lower = query.lower()
     filtered_posts = []
 
@@ -359,6 +427,23 @@ def paginate_comments(comments, page, per_page):
     }
 
 
+def set_upload_cache_headers(response, file_data):
+    """Add validators and long-lived caching to an uploaded file response"""
+    if file_data.get('sha256'):
+        response.set_etag(file_data['sha256'])
+    if file_data.get('timestamp'):
+        try:
+            # Stored timestamps are naive local time
+            response.last_modified = datetime.fromisoformat(file_data['timestamp']).astimezone()
+        except ValueError:
+            pass
+    # Upload filenames are uuid-based, so a URL's content never changes
+    response.cache_control.public = True
+    response.cache_control.max_age = UPLOAD_CACHE_MAX_AGE
+    response.cache_control.immutable = True
+    return response
+
+
 @app.errorhandler(RequestEntityTooLarge)
 def handle_file_too_large(e):
     """Handle file too large error"""
@@ -370,37 +455,90 @@ def handle_file_too_large(e):
 
 
 
+def cached_page(key, collections, render):
+    """Serve a page from the page cache, rendering it on a miss"""
+    # Pending flash messages make the page specific to this visitor
+    if session.get('_flashes'):
+        return render()
+    # Read generations before rendering: a write racing with the render
+    # leaves a stale generation behind, never a stale page under a fresh one
+    generations = tuple(storage.generation(collection) for collection in collections)
+    html = page_cache.get(key, generations)
+    if html is None:
+        html = render()
+        page_cache.put(key, generations, html)
+    return html
+
+
+def conditional(*collections):
+    """
+    Validate a read route by the storage generations of the collections it shows
+
+    Revalidations (If-None-Match, else If-Modified-Since) are answered with 304
+    before the view runs, so nothing is loaded, rendered or serialized. Full
+    responses get a weak ETag, Last-Modified and Cache-Control: no-cache.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # Pending flash messages make the response specific to this visitor
+            if session.get('_flashes'):
+                return view(*args, **kwargs)
+            # Read before the view runs: a racing write leaves an older ETag on
+            # newer content, which only costs the client a full response later
+            generations = tuple(storage.generation(collection) for collection in collections)
+            etag = weak_etag(request.full_path, generations)
+            last_modified = validator_clock.last_modified(request.full_path, etag)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = since is not None and since >= last_modified
+            if not_modified:
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
+
+
 @app.route('/')
+@conditional('posts', 'likes', 'comments')
 def index():
     """Main community feed with pagination and search"""
     page = request.args.get('page', 1, type=int)
     search_query = request.args.get('search', '', type=str)
+    return cached_page(('index', page, search_query), ('posts', 'likes', 'comments'),
+                       lambda: render_index(page, search_query))
 
+
+def render_index(page, search_query):
+    """Render one page of the feed, optionally filtered by a search"""
     # Get posts (filtered by search if query provided)
     if search_query:
         posts = search_posts(search_query)
     else:
         posts = load_posts()
 
-    # Add likes and comments data to posts
-    likes = load_likes()
-    comments = load_comments()
-
-    for post in posts:
-        post_id = post['id']
-        post['like_count'] = len(likes.get(post_id, []))
-        post_comments = comments.get(post_id, [])
-        post['comment_count'] = len(post_comments)
-
-        # Sort comments by timestamp (newest first)
-        post_comments_sorted = sorted(post_comments,
-                                      key=lambda x: x.get('timestamp', ''),
-                                      reverse=True)
-        post['comments_data'] = post_comments_sorted
-
-    # Paginate posts
+    # Paginate first so only the posts on this page get enriched
     pagination = paginate_posts(posts, page, POSTS_PER_PAGE)
 
+    # Project the page's posts with likes and comments data; stored records
+    # are left untouched
+    likes = storage.likes
+    comments = storage.comments
+    pagination['posts'] = [
+        post_view(post, likes, comments, COMMENT_PREVIEW_SIZE)
+        for post in pagination['posts']
+    ]
+
     return render_template('index.html',
                            posts=pagination['posts'],
                            pagination=pagination,
@@ -464,7 +602,7 @@ def create_post_route():
                         
                         content_type = file.content_type or 'application/octet-stream'
                         
-                        if memory_storage.store_file(file_content, unique_filename, content_type):
+                        if storage.store_file(file_content, unique_filename, content_type):
                             uploaded_filename = unique_filename
                             logging.info(f"File stored in memory: {unique_filename} ({file_size} bytes)")
                         else:
@@ -507,6 +645,10 @@ def like_post(post_id):
             'error')
         return redirect(url_for('index'))
 
+    if storage.get_record('posts', post_id) is None:
+        flash('That post doesn\'t exist! It got flushed! 🚽', 'error')
+        return redirect(url_for('index'))
+
     action, like_count = toggle_like(post_id, username)
 
     if action == 'liked':
@@ -549,6 +691,10 @@ def add_comment_route(post_id):
         flash(error_msg, 'error')
         return redirect(url_for('index'))
 
+    if storage.get_record('posts', post_id) is None:
+        flash('That post doesn\'t exist! It got flushed! 🚽', 'error')
+        return redirect(url_for('index'))
+
     comment = add_comment(post_id, username, comment_content)
     if comment:
         flash('Comment added! Your brainrot wisdom has been shared! ⚡',
@@ -560,38 +706,35 @@ def add_comment_route(post_id):
 
 
 @app.route('/hall-of-fame')
+@conditional('posts', 'likes', 'comments')
 def hall_of_fame():
     """Hall of Fame page"""
-    fame_posts = load_hall_of_fame()
-    return render_template('hall_of_fame.html',
-                           posts=fame_posts,
-                           hall_type='fame')
+    return cached_page(('hall_of_fame',), ('posts', 'likes', 'comments'),
+                       lambda: render_template('hall_of_fame.html',
+                                               posts=load_hall_of_fame(),
+                                               hall_type='fame'))
 
 
 @app.route('/hall-of-shame')
+@conditional('posts', 'likes', 'comments')
 def hall_of_shame():
     """Hall of Shame page"""
-    shame_posts = load_hall_of_shame()
-    return render_template('hall_of_shame.html',
-                           posts=shame_posts,
-                           hall_type='shame')
+    return cached_page(('hall_of_shame',), ('posts', 'likes', 'comments'),
+                       lambda: render_template('hall_of_shame.html',
+                                               posts=load_hall_of_shame(),
+                                               hall_type='shame'))
 
 
 @app.route('/comments/<post_id>')
+@conditional('comments')
 def get_comments(post_id):
     """Get paginated comments for a post"""
     page = request.args.get('page', 1, type=int)
-    comments = load_comments()
-    post_comments = comments.get(post_id, [])
-
-    # Sort comments by timestamp (newest first)
-    post_comments_sorted = sorted(post_comments,
-                                  key=lambda x: x.get('timestamp', ''),
-                                  reverse=True)
+    # Comments are stored in time order; the view slices newest-first
+    post_comments = storage.comments.newest_first(post_id)
 
     # Paginate comments
-    pagination = paginate_comments(post_comments_sorted, page,
-                                   COMMENTS_PER_PAGE)
+    pagination = paginate_comments(post_comments, page, COMMENTS_PER_PAGE)
 
     return jsonify({
         'comments': pagination['comments'],
@@ -609,37 +752,57 @@ def get_comments(post_id):
 
 @app.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    """Serve uploaded files from memory storage"""
+    """Serve uploaded files from memory storage with range and cache support"""
     try:
-        file_data = memory_storage.get_file(filename)
+        file_data = storage.get_file(filename)
         if file_data:
-            file_content = memory_storage.get_file_content(filename)
+            etag = file_data.get('sha256')
+
+            # Answer revalidation before reading (possibly spilled) content
+            if etag and request.if_none_match.contains_weak(etag):
+                return set_upload_cache_headers(Response(status=304), file_data)
+
+            file_content = storage.get_file_content(filename)
             if file_content:
-                return Response(
+                response = Response(
                     file_content,
                     mimetype=file_data.get('content_type', 'application/octet-stream'),
                     headers={'Content-Disposition': f'inline; filename="{filename}"'}
                 )
+                set_upload_cache_headers(response, file_data)
+                # Handles Range (206/416) and If-Modified-Since (304)
+                return response.make_conditional(request,
+                                                 accept_ranges=True,
+                                                 complete_length=len(file_content))
         
         logging.warning(f"File not found in memory: {filename}")
         return "File not found", 404
+    except RequestedRangeNotSatisfiable:
+        raise
     except Exception as e:
         logging.error(f"Error serving file {filename}: {e}")
         return "Error serving file", 500
 
 
 @app.route('/skibidi-scrolls')
+@conditional('videos', 'likes')
 def skibidi_scrolls():
-    """Skibidi Scrolls video feed"""
-    videos = load_videos()
+    """Skibidi Scrolls video feed, newest first or trending (?sort=trending)"""
+    sort = 'trending' if request.args.get('sort') == 'trending' else 'latest'
+    # View counts reach the videos generation at each flush, so a cached
+    # page's counts and trending order lag by at most VIEW_FLUSH_INTERVAL
+    return cached_page(('skibidi_scrolls', sort), ('videos', 'likes'),
+                       lambda: render_skibidi_scrolls(sort))
+
+
+def render_skibidi_scrolls(sort='latest'):
+    """Render the Skibidi Scrolls video feed"""
+    source = load_trending_videos() if sort == 'trending' else load_videos()
+    # Project videos with likes data; stored records are left untouched
+    likes = storage.likes
+    videos = [video_view(video, likes, view_counter) for video in source]
     
-    # Add likes data to videos
-    likes = load_likes()
-    for video in videos:
-        video_id = video['id']
-        video['like_count'] = len(likes.get(video_id, []))
-    
-    return render_template('skibidi_scrolls.html', videos=videos)
+    return render_template('skibidi_scrolls.html', videos=videos, sort=sort)
 
 
 @app.route('/upload-scroll', methods=['GET', 'POST'])
@@ -712,7 +875,7 @@ def upload_scroll():
                 
                 content_type = video_file.content_type or f'video/{file_extension}'
                 
-                if memory_storage.store_file(video_content, unique_filename, content_type):
+                if storage.store_file(video_content, unique_filename, content_type):
                     # Create the video
                     video = create_video(username, title, description, unique_filename)
                     if video:
@@ -739,44 +902,118 @@ def like_video(video_id):
     if not username:
         return jsonify({'error': 'Username required'}), 400
 
+    if storage.get_record('videos', video_id) is None:
+        return jsonify({'error': 'Video not found'}), 404
+
     action, like_count = toggle_video_like(video_id, username)
     return jsonify({'action': action, 'like_count': like_count})
 
 
+def flush_video_views(batch):
+    """Fold coalesced view counts into the stored video records"""
+    # Trending already counted these views while they were pending
+    with trending_sync.local_write() as writes:
+        for video_id, amount in list(batch.items()):
+            video = storage.get_record('videos', video_id)
+            # Counts for videos that no longer exist are dropped
+            if video is not None:
+                storage.increment('videos', video, 'views', amount)
+                writes['videos'] += 1
+            del batch[video_id]
+
+
+# View beacons are buffered here and written to storage periodically
+view_counter = ViewCounter(flush_video_views, interval=VIEW_FLUSH_INTERVAL)
+
+
 @app.route('/track-view/<video_id>', methods=['POST'])
 def track_video_view(video_id):
     """Track a video view"""
     try:
-        videos = load_videos()
+        video = storage.get_record('videos', video_id)
+        if video is None:
+            return jsonify({'success': False, 'error': 'Video not found'}), 404
         
-        # Find and update the video
-        for video in videos:
-            if video['id'] == video_id:
-                video['views'] = video.get('views', 0) + 1
-                
-                # Save updated videos
-                if save_videos(videos):
-                    return jsonify({'success': True, 'views': video['views']})
-                else:
-                    return jsonify({'success': False, 'error': 'Failed to save'}), 500
-        
-        return jsonify({'success': False, 'error': 'Video not found'}), 404
+        # The view itself is only counted in memory until the next flush
+        pending = view_counter.add(video_id)
+        # Views only reach storage generations at flush, so no sync is needed
+        trending.update(video_id, video_engagement(video, storage.likes))
+        return jsonify({'success': True, 'views': video.get('views', 0) + pending})
         
     except Exception as e:
         logging.error(f"Error tracking video view: {e}")
         return jsonify({'success': False, 'error': 'Server error'}), 500
 
 
+def encode_cursor(post):
+    """Opaque cursor pointing just past a post in newest-first order"""
+    position = json.dumps([post.get('timestamp', ''), post.get('seq', 0)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(position.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Turn a cursor back into a (timestamp, seq) position, None if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, seq = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if isinstance(timestamp, str) and isinstance(seq, int):
+            return timestamp, seq
+    except Exception:
+        pass
+    return None
+
 @app.route('/api/posts')
+@conditional('posts')
 def api_posts():
-    """API endpoint for posts (if needed for AJAX)"""
-    posts = load_posts()
-    return jsonify(posts)
+    """
+    API endpoint for posts, newest first, one cursor page at a time
+
+    Query parameters: limit (1-200, default 50), cursor (from the previous
+    page's Link header) and fields (comma-separated post fields to return).
+    The body is a JSON array streamed item by item; a Link rel="next" header
+    carries the cursor of the next page when there is one.
+    """
+    limit = request.args.get('limit', API_PAGE_SIZE, type=int)
+    if limit is None or not 1 <= limit <= API_MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {API_MAX_PAGE_SIZE}'}), 400
+    before = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        before = decode_cursor(cursor)
+        if before is None:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    fields = [field for field in request.args.get('fields', '').split(',') if field]
+
+    try:
+        # One extra record tells whether another page follows
+        posts = storage.ordered_page('posts', before, limit + 1)
+    except Exception as e:
+        logging.error(f"Error loading posts page: {e}")
+        return jsonify({'error': 'Could not load posts'}), 500
+    has_more = len(posts) > limit
+    posts = posts[:limit]
+
+    def generate():
+        yield '['
+        for i, post in enumerate(posts):
+            if fields:
+                post = {field: post[field] for field in fields if field in post}
+            else:
+                # seq is storage bookkeeping, only returned when asked for
+                post = {field: value for field, value in post.items() if field != 'seq'}
+            yield (',' if i else '') + json.dumps(post)
+        yield ']'
+
+    response = Response(generate(), mimetype='application/json')
+    if has_more:
+        next_url = url_for('api_posts', limit=limit, cursor=encode_cursor(posts[-1]),
+                           fields=','.join(fields) or None)
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
 
 @app.route('/debug/storage')
 def debug_storage():
     """Debug endpoint to check memory storage status"""
-    all_data = memory_storage.get_all_data()
+    all_data = storage.get_all_data()
     
     debug_info = {
         'storage_keys': list(all_data.keys()),
@@ -784,6 +1021,8 @@ def debug_storage():
         'files_count': len(all_data.get('files', {})),
         'files_stored': list(all_data.get('files', {}).keys())[:10],  # First 10 filenames
         'total_file_size': sum(f.get('size', 0) for f in all_data.get('files', {}).values()),
+        'storage': storage.stats(),
+        'page_cache': page_cache.stats(),
         'sample_post': all_data.get('posts', [])[0] if all_data.get('posts') else None,
         'memory_usage_estimate': len(str(all_data))
     }
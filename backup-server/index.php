@@ -18,7 +18,7 @@ header('X-Content-Type-Options: nosniff');
 header('X-Frame-Options: DENY');
 header('Access-Control-Allow-Origin: *');
 header('Access-Control-Allow-Methods: POST');
-header('Access-Control-Allow-Headers: Content-Type, User-Agent');
+header('Access-Control-Allow-Headers: Content-Type, Content-Encoding, User-Agent');
 
 // Only allow POST requests
 if ($_SERVER['REQUEST_METHOD'] !== 'POST') {
@@ -67,6 +67,16 @@ if (empty($raw_data)) {
     exit;
 }
 
+// Decompress gzip-encoded backups (capped so a small body can't expand unbounded)
+if (strtolower($_SERVER['HTTP_CONTENT_ENCODING'] ?? '') === 'gzip') {
+    $raw_data = @gzdecode($raw_data, $MAX_BACKUP_SIZE + 1);
+    if ($raw_data === false) {
+        http_response_code(400);
+        echo json_encode(['error' => 'Invalid or oversized gzip data.']);
+        exit;
+    }
+}
+
 // Check data size
 if (strlen($raw_data) > $MAX_BACKUP_SIZE) {
     http_response_code(413);
@@ -82,6 +92,21 @@ if (json_last_error() !== JSON_ERROR_NONE) {
     exit;
 }
 
+// Blob query: report which content hashes are already stored, so a restarted
+// client doesn't resend blobs it can no longer remember sending
+if (isset($backup_data['have']) && is_array($backup_data['have'])) {
+    $held = [];
+    foreach ($backup_data['have'] as $hash) {
+        $hash = (string)$hash;
+        if (preg_match('/^[0-9a-f]{64}$/', $hash) && file_exists("$BACKUP_DIR/blobs/$hash.blob")) {
+            $held[] = $hash;
+        }
+    }
+    http_response_code(200);
+    echo json_encode(['success' => true, 'blobs' => $held]);
+    exit;
+}
+
 // Validate backup structure
 if (!isset($backup_data['timestamp']) || !isset($backup_data['data'])) {
     http_response_code(400);
@@ -89,6 +114,34 @@ if (!isset($backup_data['timestamp']) || !isset($backup_data['data'])) {
     exit;
 }
 
+// Store content-addressed file blobs once; the backup file keeps only their hashes
+$blobs_stored = 0;
+if (isset($backup_data['blobs']) && is_array($backup_data['blobs'])) {
+    $blob_dir = $BACKUP_DIR . '/blobs';
+    if (!is_dir($blob_dir) && !mkdir($blob_dir, 0755, true)) {
+        http_response_code(500);
+        echo json_encode(['error' => 'Failed to create blob directory.']);
+        exit;
+    }
+    foreach ($backup_data['blobs'] as $hash => $encoded) {
+        $hash = (string)$hash;
+        $content = base64_decode($encoded, true);
+        if (!preg_match('/^[0-9a-f]{64}$/', $hash) || $content === false || hash('sha256', $content) !== $hash) {
+            http_response_code(400);
+            echo json_encode(['error' => 'Invalid blob data.']);
+            exit;
+        }
+        $blob_path = "$blob_dir/$hash.blob";
+        if (!file_exists($blob_path) && file_put_contents($blob_path, $content, LOCK_EX) === false) {
+            http_response_code(500);
+            echo json_encode(['error' => 'Failed to save blob.']);
+            exit;
+        }
+        $blobs_stored++;
+    }
+    $backup_data['blobs'] = array_map('strval', array_keys($backup_data['blobs']));
+}
+
 // Generate backup filename with timestamp
 $timestamp = date('Y-m-d_H-i-s');
 $backup_filename = "skibidi_hub_backup_$timestamp.json";
@@ -134,7 +187,8 @@ echo json_encode([
     'message' => 'Backup received and stored successfully.',
     'filename' => $backup_filename,
     'timestamp' => date('c'),
-    'size' => strlen($raw_data)
+    'size' => strlen($raw_data),
+    'blobs_stored' => $blobs_stored
 ]);
 
 /**
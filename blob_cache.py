@@ -0,0 +1,99 @@
+"""
+Blob Cache for Skibidi Hub
+
+Keeps what the Vercel Blob backend learned about each blob in process: its
+URL, upload metadata, and for JSON data blobs the document bytes with their
+ETag. Entries younger than the TTL are served without any network call; older
+ones are revalidated with a conditional GET that costs no body on 304.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class BlobCacheEntry:
+    """What is known about one blob pathname"""
+
+    __slots__ = ('url', 'etag', 'content', 'digest', 'meta', 'checked_at')
+
+    def __init__(self, url: Optional[str]):
+        self.url = url  # None records that the blob doesn't exist
+        self.etag: Optional[str] = None
+        self.content: Optional[bytes] = None
+        self.digest: Optional[str] = None  # content hash, the same in every worker
+        self.meta: Optional[Dict[str, Any]] = None
+        self.checked_at = time.monotonic()
+
+
+class BlobCache:
+    """Bounded LRU of blob entries keyed by pathname"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 5.0):
+        """
+        Initialize an empty cache
+
+        Args:
+            max_entries: Entries kept before the least recently used is dropped
+            ttl: Seconds an entry is trusted before it must be revalidated
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, BlobCacheEntry]' = OrderedDict()
+
+    def get(self, pathname: str) -> Optional[BlobCacheEntry]:
+        """Look up an entry, marking it most recently used"""
+        with self._lock:
+            entry = self._entries.get(pathname)
+            if entry is not None:
+                self._entries.move_to_end(pathname)
+            return entry
+
+    def is_fresh(self, entry: BlobCacheEntry) -> bool:
+        """Whether an entry may be used without asking the blob service"""
+        return time.monotonic() - entry.checked_at < self.ttl
+
+    def set_url(self, pathname: str, url: Optional[str]) -> BlobCacheEntry:
+        """Record where a blob lives (or that it is missing), dropping stale content"""
+        entry = BlobCacheEntry(url)
+        self._put(pathname, entry)
+        return entry
+
+    def set_content(self, pathname: str, url: str, content: bytes, etag: Optional[str] = None) -> BlobCacheEntry:
+        """Record a blob's current content, as downloaded or just uploaded"""
+        entry = BlobCacheEntry(url)
+        entry.content = content
+        entry.digest = hashlib.sha1(content).hexdigest()
+        entry.etag = etag
+        self._put(pathname, entry)
+        return entry
+
+    def set_meta(self, pathname: str, url: str, meta: Dict[str, Any]) -> None:
+        """Record upload metadata for a blob"""
+        entry = BlobCacheEntry(url)
+        entry.meta = meta
+        self._put(pathname, entry)
+
+    def mark_checked(self, entry: BlobCacheEntry) -> None:
+        """Restart an entry's TTL after the blob service confirmed it"""
+        entry.checked_at = time.monotonic()
+
+    def invalidate(self, pathname: str) -> None:
+        """Forget a blob (after delete, or when its URL stopped resolving)"""
+        with self._lock:
+            self._entries.pop(pathname, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and settings for monitoring"""
+        return {'entries': len(self._entries), 'max_entries': self.max_entries, 'ttl': self.ttl}
+
+    def _put(self, pathname: str, entry: BlobCacheEntry) -> None:
+        """Insert an entry, evicting the least recently used over the limit"""
+        with self._lock:
+            self._entries[pathname] = entry
+            self._entries.move_to_end(pathname)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Blob Migration for Skibidi Hub
+
+Copies local data files and uploads into Vercel Blob with a bounded pool of
+upload workers. Each finished upload is recorded in a checkpoint manifest, so
+an interrupted migration resumes where it stopped and skips blobs that were
+already copied. Upload content is memory-mapped rather than read into RAM.
+
+Run with: python blob_migration.py [data_folder] [upload_folder]
+"""
+
+import json
+import logging
+import mmap
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# JSON data files migrated to data/<name>
+DATA_FILES = ('posts.json', 'comments.json', 'likes.json', 'hall_of_fame.json',
+              'hall_of_shame.json', 'videos.json')
+
+# Completed uploads between manifest checkpoints
+CHECKPOINT_EVERY = 25
+
+# Seconds between progress log lines
+PROGRESS_INTERVAL = 5.0
+
+
+class _MappedFile:
+    """Context manager giving a file's bytes through a read-only mapping"""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._file = None
+        self._mmap = None
+
+    def __enter__(self):
+        self._file = open(self._path, 'rb')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            return b''
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def __exit__(self, *exc_info):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+
+class BlobMigration:
+    """Resumable, concurrent copy of local files into blob storage"""
+
+    def __init__(self, storage, manifest_path: str, workers: int = 8):
+        """
+        Initialize a migration
+
+        Args:
+            storage: VercelBlobStorage to upload through
+            manifest_path: Checkpoint file recording finished uploads
+            workers: Uploads in flight at once
+        """
+        self.storage = storage
+        self.manifest_path = manifest_path
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+        self._unsaved = 0
+        self.stats = {
+            'files_total': 0,
+            'files_done': 0,
+            'files_skipped': 0,
+            'files_failed': 0,
+            'bytes_total': 0,
+            'bytes_done': 0,
+            'elapsed': 0.0,
+        }
+        self._started = 0.0
+        self._last_progress = 0.0
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Read the checkpoint manifest left by an earlier run, if any"""
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable migration manifest {self.manifest_path}: {e}")
+            return {}
+
+    def _save_manifest(self) -> None:
+        """Atomically write the checkpoint manifest; caller holds the lock"""
+        temp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(temp_path, self.manifest_path)
+        self._unsaved = 0
+
+    def plan(self, data_folder: str, upload_folder: str) -> List[Tuple[str, str]]:
+        """List (local path, blob name) pairs still to migrate, skipping finished ones"""
+        sources = []
+        for data_file in DATA_FILES:
+            sources.append((os.path.join(data_folder, data_file), f"data/{data_file}"))
+        if os.path.isdir(upload_folder):
+            with os.scandir(upload_folder) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        sources.append((entry.path, f"uploads/{entry.name}"))
+
+        pending = []
+        for path, blob_name in sources:
+            if not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            self.stats['files_total'] += 1
+            self.stats['bytes_total'] += stat.st_size
+            done = self._manifest.get(blob_name)
+            if done and done['size'] == stat.st_size and done['mtime_ns'] == stat.st_mtime_ns:
+                self.stats['files_skipped'] += 1
+                continue
+            pending.append((path, blob_name))
+        return pending
+
+    def run(self, data_folder: str = "data", upload_folder: str = "uploads") -> bool:
+        """Migrate everything not yet in the manifest; True if nothing failed"""
+        self._started = self._last_progress = time.monotonic()
+        pending = self.plan(data_folder, upload_folder)
+        logger.info(f"Migrating {len(pending)} files ({self.stats['files_skipped']} already migrated) "
+                    f"with {self.workers} workers")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='blob-migration') as pool:
+            futures = {pool.submit(self._migrate_one, path, blob_name): blob_name
+                       for path, blob_name in pending}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Error migrating {futures[future]}: {e}")
+                    with self._lock:
+                        self.stats['files_failed'] += 1
+
+        with self._lock:
+            self._save_manifest()
+            self.stats['elapsed'] = time.monotonic() - self._started
+        self._log_progress(final=True)
+        return self.stats['files_failed'] == 0
+
+    def _migrate_one(self, path: str, blob_name: str) -> None:
+        """Upload one file and checkpoint it"""
+        stat = os.stat(path)
+        if blob_name.startswith('data/'):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not self.storage.put_json_data(blob_name[len('data/'):-len('.json')], data):
+                raise RuntimeError("upload failed")
+            entry = self.storage.cache.get(blob_name)
+            url = entry.url if entry else None
+        else:
+            with _MappedFile(path) as content:
+                url = self.storage.put_file(content, blob_name[len('uploads/'):])
+            if not url:
+                raise RuntimeError("upload failed")
+
+        with self._lock:
+            self._manifest[blob_name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'url': url}
+            self.stats['files_done'] += 1
+            self.stats['bytes_done'] += stat.st_size
+            self._unsaved += 1
+            if self._unsaved >= CHECKPOINT_EVERY:
+                self._save_manifest()
+        self._log_progress()
+
+    def _log_progress(self, final: bool = False) -> None:
+        """Log files and throughput at most every PROGRESS_INTERVAL seconds"""
+        now = time.monotonic()
+        with self._lock:
+            if not final and now - self._last_progress < PROGRESS_INTERVAL:
+                return
+            self._last_progress = now
+            stats = dict(self.stats)
+        elapsed = max(now - self._started, 1e-9)
+        finished = stats['files_done'] + stats['files_skipped'] + stats['files_failed']
+        logger.info(f"Migration {'finished' if final else 'progress'}: "
+                    f"{finished}/{stats['files_total']} files "
+                    f"({stats['files_skipped']} skipped, {stats['files_failed']} failed), "
+                    f"{stats['bytes_done'] / 1024 / 1024:.2f}MB uploaded at "
+                    f"{stats['bytes_done'] / 1024 / 1024 / elapsed:.2f}MB/s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a migration from the command line"""
+    from storage_service import VercelBlobStorage
+
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[1:] if argv is None else argv
+    data_folder = args[0] if len(args) > 0 else "data"
+    upload_folder = args[1] if len(args) > 1 else "uploads"
+    success = VercelBlobStorage().migrate_local_data(data_folder, upload_folder)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
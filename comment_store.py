@@ -0,0 +1,74 @@
+"""
+Comment Storage for Skibidi Hub
+
+Each post's comments are kept in their own list in insertion (time) order, so
+adding a comment is an O(1) append, counts need no scan, and newest-first
+pages are O(page) slices of a reversed view.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Set
+
+from ordered_view import NewestFirstView
+
+logger = logging.getLogger(__name__)
+
+
+def _comment_key(comment: Dict[str, Any]) -> str:
+    """Sort key used when loading comments from an external source"""
+    return comment.get('timestamp', '')
+
+
+class CommentStore:
+    """Per-post comment lists kept in insertion order.
+
+    Lists handed out by ``snapshot()`` are shared copy-on-write: the next
+    append to such a post copies its list first, so a snapshot never sees
+    later writes and unchanged posts are never copied.
+    """
+
+    def __init__(self):
+        """Initialize an empty comment store"""
+        self.lock = threading.RLock()
+        self._comments: Dict[str, List[Dict[str, Any]]] = {}
+        self._shared: Set[str] = set()  # post ids whose list a snapshot holds
+
+    def add(self, post_id: str, comment: Dict[str, Any]) -> None:
+        """Append a comment to a post"""
+        with self.lock:
+            if post_id in self._shared:
+                self._comments[post_id] = list(self._comments[post_id])
+                self._shared.discard(post_id)
+            self._comments.setdefault(post_id, []).append(comment)
+
+    def count(self, post_id: str) -> int:
+        """Number of comments on a post"""
+        comments = self._comments.get(post_id)
+        return len(comments) if comments else 0
+
+    def newest_first(self, post_id: str) -> NewestFirstView:
+        """Newest-first view of a post's comments, sliceable without copying"""
+        return NewestFirstView(self._comments.get(post_id, []))
+
+    def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Export comments as {post_id: [comment, ...]} for backups"""
+        return self.snapshot()
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Point-in-time copy of all comments; per-post lists are shared copy-on-write"""
+        with self.lock:
+            self._shared.update(self._comments)
+            return dict(self._comments)
+
+    def load(self, data: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Replace all comments from a {post_id: [comment, ...]} mapping"""
+        with self.lock:
+            self._comments = {}
+            self._shared = set()
+            if not isinstance(data, dict):
+                logger.warning("Comments data is not a dict, starting with no comments")
+                return
+            for post_id, comments in data.items():
+                # Sort once on load; afterwards appends keep the order
+                self._comments[post_id] = sorted(comments, key=_comment_key)
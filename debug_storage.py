@@ -3,14 +3,15 @@
 Debug script to check what's actually stored in memory
 """
 
-from memory_storage import memory_storage
+from storage_backend import create_storage
 import json
 
 def debug_storage():
-    print("=== MEMORY STORAGE DEBUG ===")
+    storage = create_storage()
+    print(f"=== {type(storage).__name__.upper()} DEBUG ===")
     
     # Get all data
-    data = memory_storage.get_all_data()
+    data = storage.get_all_data()
     
     print(f"Data keys: {list(data.keys())}")
     
@@ -0,0 +1,227 @@
+"""
+File Storage for Skibidi Hub
+
+Uploaded files are kept in RAM up to a configurable memory budget. When the
+budget is exceeded, the least recently used files are spilled to a local
+append-only segment file and served back through ``mmap``, so an instance can
+hold far more media than it has memory while hot files stay in RAM.
+"""
+
+import logging
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _same(content: bytes) -> bytes:
+    """Content reader for files held in RAM"""
+    return content
+
+
+class Segment:
+    """Blob segment file whose content is read back through ``mmap``"""
+
+    def __init__(self, file, size: int = 0):
+        self._file = file
+        self.size = size
+        self._mmap = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open_readonly(cls, path: str) -> 'Segment':
+        """Open an existing file (e.g. a snapshot) as a read-only segment"""
+        file = open(path, 'rb')
+        return cls(file, os.fstat(file.fileno()).st_size)
+
+    def append(self, content: bytes) -> int:
+        """Append content, returning its offset"""
+        with self._lock:
+            offset = self.size
+            self._file.seek(offset)
+            self._file.write(content)
+            self._file.flush()
+            self.size += len(content)
+            return offset
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Read bytes through a mapping of the segment file"""
+        if size == 0:
+            return b''
+        with self._lock:
+            if self._mmap is None or len(self._mmap) < offset + size:
+                # Segments only grow, so remap to cover newly appended data
+                if self._mmap is not None:
+                    self._mmap.close()
+                self._mmap = mmap.mmap(self._file.fileno(), self.size, access=mmap.ACCESS_READ)
+            return self._mmap[offset:offset + size]
+
+
+class FileStore:
+    """LRU file content cache with an mmap-backed append-only spill segment.
+
+    ``lock`` guards the metadata, LRU order and spill map. Segments are never
+    truncated, so a content reference taken under the lock stays readable
+    after the file is deleted or evicted.
+    """
+
+    def __init__(self, memory_budget: Optional[int] = None, spill_path: Optional[str] = None):
+        """
+        Initialize the file store
+
+        Args:
+            memory_budget: Max bytes of file content kept in RAM (None = unlimited)
+            spill_path: Segment file for spilled content (temp file if None)
+        """
+        self.memory_budget = memory_budget
+        self.spill_path = spill_path
+        self.lock = threading.RLock()
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self._hot: 'OrderedDict[str, bytes]' = OrderedDict()  # LRU order, oldest first
+        self._hot_bytes = 0
+        self._spilled: Dict[str, Tuple[Segment, int, int]] = {}  # filename -> (segment, offset, size)
+        self._segment: Optional[Segment] = None  # own append-only spill segment
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._meta
+
+    def __len__(self) -> int:
+        return len(self._meta)
+
+    def put(self, filename: str, content: bytes, meta: Dict[str, Any]) -> None:
+        """Store file content with its metadata, spilling cold files if needed"""
+        with self.lock:
+            self.delete(filename)
+            self._meta[filename] = dict(meta)
+            self._hot[filename] = content
+            self._hot_bytes += len(content)
+            self._enforce_budget()
+
+    def attach(self, filename: str, meta: Dict[str, Any], segment: Segment, offset: int, size: int) -> None:
+        """Register a file whose content already sits in a segment (loaded lazily)"""
+        with self.lock:
+            self.delete(filename)
+            self._meta[filename] = dict(meta)
+            self._spilled[filename] = (segment, offset, size)
+
+    def get_meta(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Get file metadata (content type, size, timestamp) without content"""
+        return self._meta.get(filename)
+
+    def get_content(self, filename: str, promote: bool = True) -> Optional[bytes]:
+        """
+        Get file content, from RAM if hot or from the spill segment otherwise
+
+        Args:
+            filename: Name of the file
+            promote: Bring spilled content back into RAM as most recently used
+        """
+        with self.lock:
+            content = self._hot.get(filename)
+            if content is not None:
+                self._hot.move_to_end(filename)
+                return content
+            location = self._spilled.get(filename)
+            if location is None:
+                return None
+            segment, offset, size = location
+            content = segment.read(offset, size)
+            if promote:
+                # The spilled copy stays valid, so evicting this again is free
+                self._hot[filename] = content
+                self._hot_bytes += len(content)
+                self._enforce_budget()
+            return content
+
+    def delete(self, filename: str) -> bool:
+        """Delete a file; spilled bytes are left in the append-only segment"""
+        with self.lock:
+            if filename not in self._meta:
+                return False
+            del self._meta[filename]
+            content = self._hot.pop(filename, None)
+            if content is not None:
+                self._hot_bytes -= len(content)
+            self._spilled.pop(filename, None)
+            return True
+
+    def list_files(self) -> List[str]:
+        """List all stored filenames"""
+        with self.lock:
+            return list(self._meta)
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Iterate over (filename, metadata) pairs"""
+        with self.lock:
+            return iter(list(self._meta.items()))
+
+    def snapshot(self) -> Dict[str, Tuple[Dict[str, Any], Callable[[], bytes]]]:
+        """Point-in-time {filename: (metadata, content reader)} without reading content"""
+        with self.lock:
+            return {filename: self._ref(filename) for filename in self._meta}
+
+    def get_ref(self, filename: str) -> Optional[Tuple[Dict[str, Any], Callable[[], bytes]]]:
+        """(metadata, content reader) for one file, or None if it doesn't exist"""
+        with self.lock:
+            return self._ref(filename) if filename in self._meta else None
+
+    def _ref(self, filename: str) -> Tuple[Dict[str, Any], Callable[[], bytes]]:
+        """Metadata copy plus a reader that stays valid after delete/eviction"""
+        content = self._hot.get(filename)
+        if content is not None:
+            reader = partial(_same, content)
+        else:
+            segment, offset, size = self._spilled[filename]
+            reader = partial(segment.read, offset, size)
+        return dict(self._meta[filename]), reader
+
+    def clear(self) -> None:
+        """Drop all files (the spill segment is kept and reused)"""
+        with self.lock:
+            self._meta.clear()
+            self._hot.clear()
+            self._hot_bytes = 0
+            self._spilled.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory and spill usage for monitoring"""
+        return {
+            'memory_budget': self.memory_budget,
+            'memory_bytes': self._hot_bytes,
+            'hot_files': len(self._hot),
+            'spilled_files': len(self._spilled),
+            'segment_bytes': self._segment.size if self._segment else 0,
+        }
+
+    def _enforce_budget(self) -> None:
+        """Evict least recently used content until RAM usage fits the budget"""
+        if self.memory_budget is None:
+            return
+        while self._hot_bytes > self.memory_budget and self._hot:
+            filename, content = self._hot.popitem(last=False)
+            self._hot_bytes -= len(content)
+            if filename not in self._spilled:
+                self._spilled[filename] = self._append_to_segment(content)
+
+    def _append_to_segment(self, content: bytes) -> Tuple[Segment, int, int]:
+        """Append content to the spill segment, returning its location"""
+        if self._segment is None:
+            if self.spill_path:
+                self._segment = Segment(open(self.spill_path, 'w+b'))
+            else:
+                self._segment = Segment(tempfile.TemporaryFile(prefix='skibidi-files-'))
+            logger.info(f"Spilling file content to disk segment: {self.spill_path or 'temporary file'}")
+        return self._segment, self._segment.append(content), len(content)
+
+
+def file_store_from_env() -> FileStore:
+    """Build a file store configured by FILE_MEMORY_BUDGET_MB and FILE_SPILL_PATH"""
+    budget_mb = os.environ.get('FILE_MEMORY_BUDGET_MB', '256')
+    memory_budget = int(float(budget_mb) * 1024 * 1024) if budget_mb else None
+    return FileStore(memory_budget=memory_budget,
+                     spill_path=os.environ.get('FILE_SPILL_PATH'))
@@ -0,0 +1,57 @@
+"""
+HTTP Validators for Skibidi Hub
+
+Read routes are validated by the storage generations of the collections they
+show, so a revalidation can be answered with 304 before anything is loaded or
+rendered. ETags are derived from the generations themselves; Last-Modified is
+the time this process first served a resource's current ETag, moved forward
+when needed so every new version of a resource gets a later second than the
+one before it (If-Modified-Since has whole-second resolution).
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Hashable, Tuple
+
+
+def weak_etag(key: Hashable, generations: Tuple[Any, ...]) -> str:
+    """Opaque (unquoted) weak ETag value for a resource at these generations"""
+    return hashlib.sha1(repr((key, generations)).encode('utf-8')).hexdigest()[:20]
+
+
+class ValidatorClock:
+    """
+    Per-resource Last-Modified times that strictly increase with each new ETag
+
+    The times are per process; ETag revalidation stays exact across workers.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """Initialize an empty clock remembering at most max_entries resources"""
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._resources: 'OrderedDict[Hashable, Tuple[str, datetime]]' = OrderedDict()
+        # Latest time handed to a forgotten resource, so its next version
+        # still lands on a later second
+        self._forgotten = datetime.min.replace(tzinfo=timezone.utc)
+
+    def last_modified(self, resource: Hashable, etag: str) -> datetime:
+        """Time (UTC, whole seconds) the resource's current ETag was first seen"""
+        with self._lock:
+            known = self._resources.get(resource)
+            if known is not None and known[0] == etag:
+                self._resources.move_to_end(resource)
+                return known[1]
+            previous = known[1] if known is not None else self._forgotten
+            # Two versions in the same second must not share a Last-Modified,
+            # or a client holding the older one would get a wrong 304
+            seen = max(datetime.now(timezone.utc).replace(microsecond=0),
+                       previous + timedelta(seconds=1))
+            self._resources[resource] = (etag, seen)
+            self._resources.move_to_end(resource)
+            while len(self._resources) > self.max_entries:
+                _, (_, forgotten) = self._resources.popitem(last=False)
+                self._forgotten = max(self._forgotten, forgotten)
+            return seen
@@ -0,0 +1,244 @@
+"""
+Leaderboards for Skibidi Hub
+
+Ranks records by a weighted engagement score (likes, comments, views) and
+keeps the best K in a bounded min-heap, so a like, comment or view costs one
+heap update instead of a rescan of every post. Records outside the top K wait
+in a max-heap, which lets a member whose score drops be replaced exactly.
+Superseded heap entries are skipped lazily and compacted away when they pile up.
+
+TrendingBoard decays engagement with record age. Scores are kept in log space
+relative to a fixed epoch, so ranks never change just because time passes and
+nothing has to be re-scored on a timer.
+
+RankingSync tracks which storage generations a worker's rankings reflect, so
+writes made by other workers trigger a full rebuild and the worker's own don't.
+"""
+
+import heapq
+import itertools
+import math
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+# Heap entries beyond this many times the live count trigger a compaction
+COMPACT_RATIO = 2
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parse scoring weights written as 'likes=3,comments=2,views=0.1'"""
+    weights = {}
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        name, _, value = part.partition('=')
+        weights[name.strip()] = float(value)
+    return weights
+
+
+class Leaderboard:
+    """Incrementally maintained top-K of records by weighted engagement"""
+
+    def __init__(self, size: int, weights: Mapping[str, float]):
+        """
+        Initialize an empty leaderboard
+
+        Args:
+            size: Records kept on the board (K)
+            weights: Score contribution per unit of each engagement count;
+                only records scoring above zero are ranked
+        """
+        self.size = size
+        self.weights = dict(weights)
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._entries: Dict[str, Tuple[float, int]] = {}  # id -> live (score, seq)
+        self._members = set()  # ids currently in the top K
+        self._top: List[Tuple[float, int, str]] = []  # min-heap of members
+        self._rest: List[Tuple[float, int, str]] = []  # max-heap (negated) of the others
+
+    def score(self, counts: Mapping[str, float]) -> Optional[float]:
+        """Weighted score of a record's engagement counts, None if not above zero"""
+        score = sum(weight * counts.get(name, 0) for name, weight in self.weights.items())
+        return score if score > 0 else None
+
+    def update(self, record_id: str, counts: Mapping[str, float]) -> Optional[float]:
+        """Re-rank a record from its current counts in O(log n), returning its score"""
+        score = self.score(counts)
+        with self._lock:
+            self._set(record_id, score)
+            self._rebalance()
+            self._maybe_compact()
+        return score
+
+    def remove(self, record_id: str) -> None:
+        """Drop a record from the rankings"""
+        with self._lock:
+            self._set(record_id, None)
+            self._rebalance()
+
+    def rebuild(self, records: Iterable[Tuple[str, Mapping[str, float]]]) -> None:
+        """Replace all rankings with (id, counts) pairs in one pass"""
+        with self._lock:
+            self._entries.clear()
+            self._members.clear()
+            self._top, self._rest = [], []
+            for record_id, counts in records:
+                score = self.score(counts)
+                if score is not None:
+                    seq = next(self._seq)
+                    self._entries[record_id] = (score, seq)
+                    self._rest.append((-score, seq, record_id))
+            heapq.heapify(self._rest)
+            self._rebalance()
+
+    def top(self) -> List[Tuple[str, float]]:
+        """The ranked (id, score) pairs, best first"""
+        with self._lock:
+            ranked = [(record_id, self._entries[record_id]) for record_id in self._members]
+        ranked.sort(key=lambda item: (-item[1][0], item[1][1]))
+        return [(record_id, score) for record_id, (score, _) in ranked]
+
+    def _set(self, record_id: str, score: Optional[float]) -> None:
+        """Record a new score (None to unrank); old heap entries go stale"""
+        was_member = record_id in self._members
+        if score is None:
+            self._entries.pop(record_id, None)
+            self._members.discard(record_id)
+            return
+        seq = next(self._seq)
+        self._entries[record_id] = (score, seq)
+        if was_member:
+            heapq.heappush(self._top, (score, seq, record_id))
+        else:
+            heapq.heappush(self._rest, (-score, seq, record_id))
+
+    def _live(self, entry: Tuple[float, int, str], members: bool) -> bool:
+        """Whether a heap entry still describes its record's place"""
+        return (self._entries.get(entry[2], (None, None))[1] == entry[1]
+                and (entry[2] in self._members) == members)
+
+    def _clean(self) -> None:
+        """Pop superseded entries off both heap heads"""
+        while self._top and not self._live(self._top[0], True):
+            heapq.heappop(self._top)
+        while self._rest and not self._live(self._rest[0], False):
+            heapq.heappop(self._rest)
+
+    def _promote(self) -> None:
+        """Move the best waiting record onto the board"""
+        _, seq, record_id = heapq.heappop(self._rest)
+        self._members.add(record_id)
+        heapq.heappush(self._top, (self._entries[record_id][0], seq, record_id))
+
+    def _rebalance(self) -> None:
+        """Restore: board holds the K best, everyone waiting scores no higher"""
+        self._clean()
+        while len(self._members) < self.size and self._rest:
+            self._promote()
+            self._clean()
+        while self._top and self._rest and -self._rest[0][0] > self._top[0][0]:
+            score, seq, record_id = heapq.heappop(self._top)
+            self._members.discard(record_id)
+            heapq.heappush(self._rest, (-score, seq, record_id))
+            self._promote()
+            self._clean()
+
+    def _maybe_compact(self) -> None:
+        """Rebuild the heaps from live entries once stale ones dominate"""
+        if len(self._top) + len(self._rest) <= COMPACT_RATIO * len(self._entries) + 64:
+            return
+        self._top, self._rest = [], []
+        for record_id, (score, seq) in self._entries.items():
+            if record_id in self._members:
+                self._top.append((score, seq, record_id))
+            else:
+                self._rest.append((-score, seq, record_id))
+        heapq.heapify(self._top)
+        heapq.heapify(self._rest)
+
+
+class TrendingBoard(Leaderboard):
+    """Leaderboard of engagement halved every half_life seconds of record age"""
+
+    def __init__(self, size: int, weights: Mapping[str, float], half_life: float):
+        """
+        Initialize an empty trending board
+
+        Args:
+            size: Records kept on the board (K)
+            weights: Score contribution per unit of each engagement count
+            half_life: Seconds of age that halve a record's score; counts
+                must carry the record's creation time as 'created' (epoch seconds)
+        """
+        super().__init__(size, weights)
+        self.half_life = half_life
+
+    def score(self, counts: Mapping[str, float]) -> Optional[float]:
+        """log(engagement * 2 ** -(age / half_life)), shifted by the same amount for every record"""
+        engagement = super().score(counts)
+        if engagement is None:
+            return None
+        # Age decay relative to the epoch: later records start higher
+        return math.log(engagement) + math.log(2) * counts.get('created', 0) / self.half_life
+
+
+class RankingSync:
+    """Rebuilds rankings when storage changed behind this worker's back"""
+
+    def __init__(self, keys: Tuple[str, ...], generation: Callable[[str], Any], rebuild: Callable[[], None]):
+        """
+        Initialize an unsynced tracker; the first ensure() rebuilds
+
+        Args:
+            keys: Storage collections the rankings depend on
+            generation: Reads one collection's storage generation
+            rebuild: Re-ranks everything from a full read of storage
+        """
+        self.keys = keys
+        self._generation = generation
+        self._rebuild = rebuild
+        self._lock = threading.Lock()
+        self.synced: Optional[Tuple[Any, ...]] = None
+
+    def _generations(self) -> Tuple[Any, ...]:
+        """Current generations of every collection the rankings depend on"""
+        return tuple(self._generation(key) for key in self.keys)
+
+    def ensure(self) -> None:
+        """Rebuild unless the rankings reflect the current generations"""
+        with self._lock:
+            generations = self._generations()
+            if generations != self.synced:
+                self._rebuild()
+                self.synced = generations
+
+    @contextmanager
+    def local_write(self, writes: Optional[Counter] = None) -> Iterator[Counter]:
+        """
+        Wrap writes whose effect on the rankings is applied incrementally
+
+        The block counts every storage write it makes in the yielded Counter,
+        by collection (pass one Counter to several trackers to share counts).
+        The synced generations only advance if they were current before the
+        block and each collection's counter then moved by exactly those
+        writes; anything else may include another worker's write, so the next
+        ensure() rebuilds. Generations that aren't counters (content digests)
+        always leave a rebuild pending after a write.
+        """
+        writes = Counter() if writes is None else writes
+        before = self._generations()
+        yield writes
+        with self._lock:
+            expected = []
+            for key, generation in zip(self.keys, before):
+                if not writes[key]:
+                    expected.append(generation)
+                elif isinstance(generation, int):
+                    expected.append(generation + writes[key])
+                else:
+                    return
+            if self.synced is not None and before == self.synced and self._generations() == tuple(expected):
+                self.synced = tuple(expected)
@@ -0,0 +1,74 @@
+"""
+Like Storage for Skibidi Hub
+
+Likes are kept as per-post sets of interned integer user ids, so toggling a
+like and checking membership are O(1) regardless of how viral a post gets,
+and each username string is stored once no matter how many posts it likes.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LikeStore:
+    """Per-post liker sets with interned usernames and O(1) counts.
+
+    ``lock`` guards all mutation and export; ``count()`` is a single set
+    length read and needs no lock.
+    """
+
+    def __init__(self):
+        """Initialize an empty like store"""
+        self.lock = threading.RLock()
+        self._user_ids: Dict[str, int] = {}
+        self._usernames: List[str] = []
+        self._likers: Dict[str, Set[int]] = {}
+
+    def _intern(self, username: str) -> int:
+        """Return the integer id for a username, assigning one if needed"""
+        user_id = self._user_ids.get(username)
+        if user_id is None:
+            user_id = len(self._usernames)
+            self._user_ids[username] = user_id
+            self._usernames.append(username)
+        return user_id
+
+    def toggle(self, post_id: str, username: str) -> Tuple[str, int]:
+        """Toggle a like, returning the action taken and the new like count"""
+        with self.lock:
+            likers = self._likers.setdefault(post_id, set())
+            user_id = self._intern(username)
+            if user_id in likers:
+                likers.discard(user_id)
+                action = 'unliked'
+            else:
+                likers.add(user_id)
+                action = 'liked'
+            return action, len(likers)
+
+    def count(self, post_id: str) -> int:
+        """Number of likes on a post (set size is tracked, not recounted)"""
+        likers = self._likers.get(post_id)
+        return len(likers) if likers else 0
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """Export likes as {post_id: [username, ...]} for backups"""
+        with self.lock:
+            return {
+                post_id: [self._usernames[user_id] for user_id in likers]
+                for post_id, likers in self._likers.items()
+                if likers
+            }
+
+    def load(self, data: Dict[str, List[str]]) -> None:
+        """Replace all likes from a {post_id: [username, ...]} mapping"""
+        with self.lock:
+            self._likers = {}
+            if not isinstance(data, dict):
+                logger.warning("Likes data is not a dict, starting with no likes")
+                return
+            for post_id, usernames in data.items():
+                self._likers[post_id] = {self._intern(name) for name in usernames}
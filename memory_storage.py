@@ -5,6 +5,7 @@ This module provides in-memory storage using Python dictionaries with
 backup functionality to send data to external URLs.
 """
 
+import atexit
 import json
 import logging
 import os
@@ -12,29 +13,103 @@ import requests
 import threading
 import time
 import base64
+import bisect
+import zlib
+import hashlib
+from contextlib import ExitStack, contextmanager
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+
+from comment_store import CommentStore
+from file_store import FileStore, Segment, file_store_from_env
+from like_store import LikeStore
+from ordered_view import NewestFirstView
+from search_index import SearchIndex, SearchResults
+from snapshot import read_snapshot_index, write_snapshot
+from storage_backend import (COLLECTIONS, ENGAGEMENT_KINDS, ORDERED_KEYS, SEARCH_FIELDS, order_key,
+                             record_engagement)
 
 logger = logging.getLogger(__name__)
 
+# Uncompressed bytes buffered before each gzip chunk of a streamed backup
+BACKUP_CHUNK_SIZE = 64 * 1024
+
+
 class MemoryStorage:
-    """In-memory storage with backup functionality"""
+    """In-memory storage with backup functionality.
+
+    Every collection has its own lock, and all writes go through methods that
+    take it, so request threads never lose updates. The likes, comments and
+    files stores use their own locks. Backups and snapshots read a
+    point-in-time copy. Collection lists in that copy are shared
+    copy-on-write, and the next write to a shared list copies it first.
+    Stored records are never changed in place, so the copy can share them too.
+    """
     
     def __init__(self):
         """Initialize in-memory storage"""
-        self.data = {
-            'posts': [],
-            'comments': [],
-            'likes': [],
-            'hall_of_fame': [],
-            'hall_of_shame': [],
-            'videos': [],
-            'files': {}  # Store files as base64 with metadata
-        }
+        self.data = {key: [] for key in COLLECTIONS}
+        
+        # Per-collection locks (created on demand) and lists a snapshot holds
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+        self._shared_keys = set()
+        
+        # Monotonic sequence id assigned to records in ordered collections
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        
+        # Likes and comments live in dedicated stores, exported under
+        # 'likes' and 'comments'
+        self.likes = LikeStore()
+        self.comments = CommentStore()
+        
+        # File content lives in a memory-budgeted store that spills to disk
+        self.files: FileStore = file_store_from_env()
+        
+        # Inverted indexes kept up to date as ordered collections change
+        self.search_indexes = {key: SearchIndex(fields) for key, fields in SEARCH_FIELDS.items()}
+        
+        # Primary-key indexes: record id -> the stored record itself
+        self.id_indexes: Dict[str, Dict[str, Dict[str, Any]]] = {key: {} for key in ORDERED_KEYS}
         
         # Backup configuration
         self.backup_url = os.environ.get('BACKUP_URL')
         self.backup_interval = int(os.environ.get('BACKUP_INTERVAL', '300'))  # 5 minutes default
+        self.checkpoint_every = int(os.environ.get('BACKUP_CHECKPOINT_EVERY', '12'))  # deltas per full backup
+        self.changelog_limit = int(os.environ.get('BACKUP_CHANGELOG_LIMIT', '10000'))
+        
+        # Mutation changelog: backups ship only changes after the last
+        # sequence number the backup server acknowledged
+        self._changelog_lock = threading.RLock()
+        self._backup_lock = threading.Lock()
+        self._changes: List[Dict[str, Any]] = []
+        self._change_seq = 0
+        self._acked_seq = 0
+        self._needs_checkpoint = True
+        self._deltas_since_checkpoint = 0
+        # Content hashes of file blobs the backup server already holds; after
+        # a restart the server is asked once which of ours it has
+        self._acked_blobs = set()
+        self._blobs_queried = False
+        
+        # Local snapshot configuration; restore before serving anything
+        self.snapshot_path = os.environ.get('SNAPSHOT_PATH')
+        self.snapshot_interval = int(os.environ.get('SNAPSHOT_INTERVAL', '60'))
+        self._mutations = 0  # bumped on every write, to skip unchanged snapshots
+        self._generations: Dict[str, int] = {}  # per-collection write counters
+        # Counters start from the load time so a restarted process never
+        # reuses the generations of an earlier one
+        self._generation_base = time.time_ns()
+        self._snapshot_mutations = 0
+        self._snapshot_lock = threading.Lock()
+        if self.snapshot_path:
+            if os.path.exists(self.snapshot_path):
+                self.restore_snapshot(self.snapshot_path)
+            self.snapshot_thread = threading.Thread(target=self._snapshot_loop, daemon=True)
+            self.snapshot_thread.start()
+            atexit.register(self.save_snapshot)
+            logger.info(f"Started snapshot thread, writing {self.snapshot_path} every {self.snapshot_interval} seconds")
         
         # Start backup thread if URL is configured
         if self.backup_url:
@@ -46,13 +121,43 @@ class MemoryStorage:
     
     def get_data(self, key: str, default: Any = None) -> Any:
         """Get data from memory storage"""
+        if key == 'likes':
+            return self.likes.to_dict()
+        if key == 'comments':
+            return self.comments.to_dict()
+        if key == 'files':
+            return dict(self.files.items())
         return self.data.get(key, default if default is not None else [])
     
     def set_data(self, key: str, value: Any) -> bool:
         """Set data in memory storage"""
         try:
-            self.data[key] = value
-            return True
+            with self._lock_for(key):
+                # Whole collections are replaced, so the next backup is a full one
+                self._record_change('set', key)
+                if key == 'likes':
+                    self.likes.load(value)
+                    return True
+                if key == 'comments':
+                    self.comments.load(value)
+                    return True
+                if key == 'files':
+                    self.files.clear()
+                    for name, file_data in value.items():
+                        file_data = self._decode_file(file_data)
+                        content = file_data.get('content', b'')
+                        meta = {k: v for k, v in file_data.items() if k != 'content'}
+                        meta.setdefault('sha256', hashlib.sha256(content).hexdigest())
+                        self.files.put(name, content, meta)
+                    return True
+                if key in ORDERED_KEYS:
+                    value = self._build_ordered(value)
+                    self.id_indexes[key] = {item['id']: item for item in value if 'id' in item}
+                    if key in self.search_indexes:
+                        self.search_indexes[key].rebuild(value)
+                self.data[key] = value
+                self._shared_keys.discard(key)
+                return True
         except Exception as e:
             logger.error(f"Error setting data for key {key}: {e}")
             return False
@@ -60,17 +165,319 @@ class MemoryStorage:
     def append_data(self, key: str, item: Any) -> bool:
         """Append item to data list"""
         try:
-            if key not in self.data:
-                self.data[key] = []
-            self.data[key].append(item)
+            if key in ORDERED_KEYS:
+                return self.insert_ordered(key, item)
+            with self._lock_for(key):
+                self._writable_list(key).append(item)
+                self._record_change('append', key, item=item)
             return True
         except Exception as e:
             logger.error(f"Error appending data to key {key}: {e}")
             return False
     
+    def insert_ordered(self, key: str, item: Dict[str, Any]) -> bool:
+        """Insert a record into an ordered collection, keeping timestamp order"""
+        try:
+            with self._lock_for(key):
+                item['seq'] = self._next_seq()
+                items = self._writable_list(key)
+                # New records almost always carry the latest timestamp: O(1) append
+                if not items or order_key(items[-1]) <= order_key(item):
+                    items.append(item)
+                else:
+                    bisect.insort(items, item, key=order_key)
+                if 'id' in item:
+                    self.id_indexes[key][item['id']] = item
+                if key in self.search_indexes:
+                    self.search_indexes[key].add(item)
+                self._record_change('append', key, item=item)
+            return True
+        except Exception as e:
+            logger.error(f"Error inserting ordered data to key {key}: {e}")
+            return False
+    
+    def generation(self, key: str) -> int:
+        """Counter bumped on every write to a collection, for cache validation"""
+        return self._generations.get(key, self._generation_base)
+    
+    def get_record(self, key: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a record of an ordered collection by id in O(1)"""
+        return self.id_indexes.get(key, {}).get(record_id)
+    
+    def increment(self, key: str, item: Dict[str, Any], field: str, amount: int = 1) -> int:
+        """Atomically add to a numeric field of a stored record, returning the new value"""
+        with self._lock_for(key):
+            items = self._writable_list(key)
+            position = self._record_position(key, items, item)
+            if position is None:
+                return item.get(field, 0) + amount
+            # Snapshots and the changelog may hold the old record: replace, don't mutate
+            record = {**items[position], field: items[position].get(field, 0) + amount}
+            items[position] = record
+            if 'id' in record and key in self.id_indexes:
+                self.id_indexes[key][record['id']] = record
+            if key in self.search_indexes:
+                self.search_indexes[key].add(record)
+            self._record_change('update', key, item=record)
+            return record[field]
+    
+    def toggle_like(self, post_id: str, username: str):
+        """Toggle a like, returning the action taken and the new like count"""
+        with self.likes.lock:
+            action, count = self.likes.toggle(post_id, username)
+            op = 'like' if action == 'liked' else 'unlike'
+            self._record_change(op, 'likes', post_id=post_id, username=username)
+        return action, count
+    
+    def add_comment(self, post_id: str, comment: Dict[str, Any]) -> bool:
+        """Append a comment to a post"""
+        try:
+            with self.comments.lock:
+                self.comments.add(post_id, comment)
+                self._record_change('append', 'comments', post_id=post_id, item=comment)
+            return True
+        except Exception as e:
+            logger.error(f"Error adding comment to post {post_id}: {e}")
+            return False
+    
+    def engagement(self, key: str, kinds: Tuple[str, ...] = ENGAGEMENT_KINDS) -> Dict[str, Dict[str, Any]]:
+        """Timestamp and engagement counts of every record in a collection that has any"""
+        with self._lock_for(key):
+            records = list(self.id_indexes.get(key, {}).values())
+        return record_engagement(records, self.likes, self.comments, kinds)
+    
+    def get_ordered(self, key: str) -> NewestFirstView:
+        """Get a newest-first view of an ordered collection without copying it"""
+        return NewestFirstView(self.data.get(key, []))
+    
+    def ordered_page(self, key: str, before: Optional[Tuple[str, int]], limit: int) -> List[Dict[str, Any]]:
+        """Up to limit records newest first, strictly older than a (timestamp, seq) position"""
+        with self._lock_for(key):
+            items = self.data.get(key, [])
+            end = len(items) if before is None else bisect.bisect_left(items, tuple(before), key=order_key)
+            return items[max(end - limit, 0):end][::-1]
+    
+    def search(self, key: str, query: str) -> SearchResults:
+        """Search an indexed collection, returning lazy newest-first matches"""
+        with self._lock_for(key):
+            return self.search_indexes[key].search(query)
+    
+    def _lock_for(self, key: str) -> threading.RLock:
+        """Lock guarding one collection"""
+        if key == 'likes':
+            return self.likes.lock
+        if key == 'comments':
+            return self.comments.lock
+        if key == 'files':
+            return self.files.lock
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.RLock())
+    
+    @contextmanager
+    def _all_locks(self):
+        """Hold every collection lock (in a fixed order) plus the changelog lock"""
+        keys = sorted(set(self.data) | {'likes', 'comments', 'files'})
+        with ExitStack() as stack:
+            for key in keys:
+                stack.enter_context(self._lock_for(key))
+            stack.enter_context(self._changelog_lock)
+            yield
+    
+    def _writable_list(self, key: str) -> List[Any]:
+        """Get a collection's list for writing, copying it first if a snapshot shares it"""
+        items = self.data.setdefault(key, [])
+        if key in self._shared_keys:
+            items = self.data[key] = list(items)
+            self._shared_keys.discard(key)
+        return items
+    
+    @staticmethod
+    def _record_position(key: str, items: List[Dict[str, Any]], item: Dict[str, Any]) -> Optional[int]:
+        """Index of a stored record in its collection's list, None if it is gone"""
+        if key in ORDERED_KEYS and 'seq' in item:
+            position = bisect.bisect_left(items, order_key(item), key=order_key)
+            if position < len(items) and items[position].get('seq') == item['seq']:
+                return position
+            return None
+        for position, record in enumerate(items):
+            if record is item or ('id' in item and record.get('id') == item['id']):
+                return position
+        return None
+    
+    def _next_seq(self) -> int:
+        """Allocate the next record sequence id"""
+        with self._seq_lock:
+            self._seq += 1
+            return self._seq
+    
+    def _build_ordered(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Sort a replacement list once and assign sequence ids where missing"""
+        items = sorted(items, key=order_key)
+        for item in items:
+            if 'seq' not in item:
+                item['seq'] = self._next_seq()
+            else:
+                with self._seq_lock:
+                    self._seq = max(self._seq, item['seq'])
+        return items
+    
     def get_all_data(self) -> Dict[str, Any]:
-        """Get all data for backup purposes"""
-        return self.data.copy()
+        """Get a consistent point-in-time copy of all data for backup purposes"""
+        return self._snapshot()[0]
+    
+    def _snapshot(self) -> Tuple[Dict[str, Any], int, Dict[str, Tuple[Dict[str, Any], Callable[[], bytes]]]]:
+        """Point-in-time (data, changelog seq, file content references)"""
+        with self._all_locks():
+            all_data = self.data.copy()
+            # Lists are shared with the copy until the next write to them
+            self._shared_keys.update(all_data)
+            all_data['likes'] = self.likes.to_dict()
+            all_data['comments'] = self.comments.snapshot()
+            file_refs = self.files.snapshot()
+            all_data['files'] = {name: meta for name, (meta, _) in file_refs.items()}  # metadata only
+            return all_data, self._change_seq, file_refs
+    
+    def _record_change(self, op: str, key: str, **payload: Any) -> None:
+        """Append a mutation to the backup changelog"""
+        with self._changelog_lock:
+            self._mutations += 1
+            self._generations[key] = self._generations.get(key, self._generation_base) + 1
+            if not self.backup_url:
+                return
+            self._change_seq += 1
+            if len(self._changes) >= self.changelog_limit:
+                # Too far behind the server to replay: checkpoint instead
+                self._changes.clear()
+                self._needs_checkpoint = True
+            if op == 'set':
+                self._needs_checkpoint = True
+            self._changes.append({'seq': self._change_seq, 'op': op, 'key': key, **payload})
+    
+    def _serialize_change(self, change: Dict[str, Any], file_refs: Dict[str, Any]) -> Dict[str, Any]:
+        """Prepare a changelog entry for the JSON backup format"""
+        if change['op'] != 'store_file':
+            return change
+        # File entries carry metadata only; content travels as a blob
+        # keyed by its sha256 (None if the file was deleted since)
+        ref = self.files.get_ref(change['filename'])
+        if ref is not None:
+            file_refs[change['filename']] = ref
+        return {**change, 'file': ref[0] if ref else None}
+    
+    def _query_held_blobs(self, hashes: List[str]) -> None:
+        """Ask the backup server which of these content hashes it already stores"""
+        try:
+            response = requests.post(
+                self.backup_url.rstrip('/') + '/',
+                json={'have': hashes},
+                headers={'User-Agent': 'SkibidiHub-Backup/1.0'},
+                timeout=30
+            )
+            # A receiver without blob queries answers once with an error; don't keep asking
+            self._blobs_queried = True
+            if response.status_code == 200:
+                held = set(response.json().get('blobs', [])) & set(hashes)
+                self._acked_blobs.update(held)
+                logger.info(f"Backup server already holds {len(held)} of {len(hashes)} blobs")
+            else:
+                logger.warning(f"Blob query failed with status {response.status_code}, sending all blobs")
+        except Exception as e:
+            logger.error(f"Blob query failed: {e}")
+    
+    def _unacked_blobs(self, file_refs: Dict[str, Tuple[Dict[str, Any], Callable[[], bytes]]]) -> Dict[str, Callable[[], bytes]]:
+        """Map content hashes the server hasn't acknowledged to a content reader"""
+        if not self._blobs_queried:
+            hashes = {meta['sha256'] for meta, _ in file_refs.values()} - self._acked_blobs
+            if hashes:
+                self._query_held_blobs(sorted(hashes))
+        blobs = {}
+        for meta, reader in file_refs.values():
+            if meta['sha256'] not in self._acked_blobs:
+                blobs.setdefault(meta['sha256'], reader)
+        return blobs
+    
+    def _build_backup(self) -> Optional[Dict[str, Any]]:
+        """Build a full checkpoint or a delta since the last acknowledged backup"""
+        with self._changelog_lock:
+            seq = self._change_seq
+            pending = [c for c in self._changes if c['seq'] > self._acked_seq]
+            full = self._needs_checkpoint or self._deltas_since_checkpoint >= self.checkpoint_every
+            if not pending and not self._needs_checkpoint:
+                return None
+        backup_data = {'timestamp': datetime.now().isoformat()}
+        
+        if full:
+            # data['files'] is the manifest: filename -> metadata with sha256
+            all_data, seq, file_refs = self._snapshot()
+            backup_data.update({
+                'seq': seq,
+                'type': 'full',
+                'blobs': self._unacked_blobs(file_refs),
+                'data': all_data
+            })
+            return backup_data
+        
+        file_refs = {}
+        changes = [self._serialize_change(c, file_refs) for c in pending]
+        backup_data.update({
+            'seq': seq,
+            'type': 'delta',
+            'since_seq': self._acked_seq,
+            'blobs': self._unacked_blobs(file_refs),
+            'data': {'changes': changes}
+        })
+        return backup_data
+    
+    def _iter_backup_json(self, backup_data: Dict[str, Any]) -> Iterator[str]:
+        """Yield the backup document as JSON text, one record or blob at a time"""
+        encoder = json.JSONEncoder(default=str)
+        yield '{'
+        for key, value in backup_data.items():
+            if key not in ('blobs', 'data'):
+                yield f'{encoder.encode(key)}: {encoder.encode(value)}, '
+        # Only one blob's base64 content exists at a time; readers don't
+        # pull cold files back into RAM
+        yield '"blobs": {'
+        for index, (sha256, reader) in enumerate(backup_data['blobs'].items()):
+            yield f'{", " if index else ""}{encoder.encode(sha256)}: '
+            yield encoder.encode(base64.b64encode(reader()).decode('utf-8'))
+        yield '}, "data": '
+        yield from encoder.iterencode(backup_data['data'])
+        yield '}'
+    
+    @staticmethod
+    def _iter_gzip(fragments: Iterator[str], stats: Dict[str, int]) -> Iterator[bytes]:
+        """Gzip-compress text fragments into chunks, counting raw and sent bytes"""
+        compressor = zlib.compressobj(wbits=31)  # gzip container
+        buffer = []
+        buffered = 0
+        for fragment in fragments:
+            raw = fragment.encode('utf-8')
+            stats['raw_bytes'] += len(raw)
+            buffer.append(raw)
+            buffered += len(raw)
+            if buffered >= BACKUP_CHUNK_SIZE:
+                chunk = compressor.compress(b''.join(buffer))
+                buffer, buffered = [], 0
+                if chunk:
+                    stats['sent_bytes'] += len(chunk)
+                    yield chunk
+        chunk = compressor.compress(b''.join(buffer)) + compressor.flush()
+        stats['sent_bytes'] += len(chunk)
+        yield chunk
+    
+    def _acknowledge_backup(self, backup_data: Dict[str, Any]) -> None:
+        """Drop changelog entries covered by a backup the server accepted"""
+        with self._changelog_lock:
+            self._acked_seq = backup_data['seq']
+            self._changes = [c for c in self._changes if c['seq'] > self._acked_seq]
+            self._acked_blobs.update(backup_data['blobs'])
+            if backup_data['type'] == 'full':
+                self._deltas_since_checkpoint = 0
+                # A 'set' recorded after the snapshot still needs a checkpoint
+                self._needs_checkpoint = any(c['op'] == 'set' for c in self._changes)
+            else:
+                self._deltas_since_checkpoint += 1
     
     def _backup_loop(self):
         """Background thread to send periodic backups"""
@@ -86,41 +493,48 @@ class MemoryStorage:
         if not self.backup_url:
             return
         
+        # One backup in flight at a time (backup thread vs force_backup)
+        with self._backup_lock:
+            self._send_backup_locked()
+    
+    def _send_backup_locked(self):
+        """Build and send one backup; caller holds the backup lock"""
         try:
-            all_data = self.get_all_data()
-            backup_data = {
-                'timestamp': datetime.now().isoformat(),
-                'data': all_data
-            }
-            
-            # Check backup payload size (most web servers handle 8-32MB by default)
-            backup_json = json.dumps(backup_data, default=str)
-            backup_size = len(backup_json.encode('utf-8'))
-            backup_size_mb = backup_size / 1024 / 1024
-            
-            # Log backup size for monitoring
-            logger.info(f"Backup payload size: {backup_size_mb:.2f}MB")
-            
-            # If backup is getting large, warn but still try to send
-            if backup_size_mb > 10:  # Warn at 10MB
-                logger.warning(f"Large backup payload: {backup_size_mb:.2f}MB - consider data cleanup")
+            backup_data = self._build_backup()
+            if backup_data is None:
+                logger.info("No changes since last acknowledged backup, skipping")
+                return
             
             # Ensure URL ends with / for proper endpoint access
             backup_url = self.backup_url.rstrip('/') + '/'
             
+            # The body is encoded once, gzip-compressed and sent chunked
+            # while it is generated, so no full copy is held in memory
+            stats = {'raw_bytes': 0, 'sent_bytes': 0}
             response = requests.post(
                 backup_url,
-                json=backup_data,
+                data=self._iter_gzip(self._iter_backup_json(backup_data), stats),
                 headers={
                     'Content-Type': 'application/json',
+                    'Content-Encoding': 'gzip',
                     'User-Agent': 'SkibidiHub-Backup/1.0'
                 },
                 timeout=60,  # Increased timeout for large files
                 verify=True  # Verify SSL certificates
             )
             
+            # Log backup size for monitoring (measured while streaming)
+            backup_size_mb = stats['raw_bytes'] / 1024 / 1024
+            logger.info(f"Backup payload size: {backup_size_mb:.2f}MB "
+                        f"({stats['sent_bytes'] / 1024 / 1024:.2f}MB gzipped)")
+            
+            # If backup is getting large, warn
+            if backup_size_mb > 10:  # Warn at 10MB
+                logger.warning(f"Large backup payload: {backup_size_mb:.2f}MB - consider data cleanup")
+            
             if response.status_code == 200:
-                logger.info(f"Backup sent successfully to {backup_url}")
+                self._acknowledge_backup(backup_data)
+                logger.info(f"{backup_data['type'].title()} backup sent successfully to {backup_url}")
                 try:
                     result = response.json()
                     logger.info(f"Server response: {result.get('message', 'OK')}")
@@ -139,15 +553,16 @@ class MemoryStorage:
             logger.error(f"Backup failed: {e}")
     
     def store_file(self, file_content: bytes, filename: str, content_type: Optional[str] = None) -> bool:
-        """Store file content in memory as base64"""
+        """Store raw file content in the memory-budgeted file store"""
         try:
             file_data = {
-                'content': base64.b64encode(file_content).decode('utf-8'),
                 'content_type': content_type or 'application/octet-stream',
                 'size': len(file_content),
+                'sha256': hashlib.sha256(file_content).hexdigest(),
                 'timestamp': datetime.now().isoformat()
             }
-            self.data['files'][filename] = file_data
+            self.files.put(filename, bytes(file_content), file_data)
+            self._record_change('store_file', 'files', filename=filename)
             logger.info(f"File stored in memory: {filename} ({len(file_content)} bytes)")
             return True
         except Exception as e:
@@ -155,31 +570,91 @@ class MemoryStorage:
             return False
     
     def get_file(self, filename: str) -> Optional[Dict[str, Any]]:
-        """Get file data from memory"""
-        return self.data['files'].get(filename)
+        """Get file metadata (content type, size, timestamp)"""
+        return self.files.get_meta(filename)
     
     def get_file_content(self, filename: str) -> Optional[bytes]:
-        """Get file content as bytes"""
-        file_data = self.get_file(filename)
-        if file_data:
-            try:
-                return base64.b64decode(file_data['content'])
-            except Exception as e:
-                logger.error(f"Error decoding file {filename}: {e}")
-        return None
+        """Get file content as bytes, from RAM or the mmap spill segment"""
+        try:
+            return self.files.get_content(filename)
+        except Exception as e:
+            logger.error(f"Error reading file {filename}: {e}")
+            return None
+    
+    @staticmethod
+    def _decode_file(file_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a file entry from the backup format back into raw bytes"""
+        content = file_data.get('content', b'')
+        if isinstance(content, str):
+            file_data = {**file_data, 'content': base64.b64decode(content)}
+        return file_data
     
     def delete_file(self, filename: str) -> bool:
         """Delete file from memory"""
-        if filename in self.data['files']:
-            del self.data['files'][filename]
+        if self.files.delete(filename):
+            self._record_change('delete_file', 'files', filename=filename)
             logger.info(f"File deleted from memory: {filename}")
             return True
         return False
     
     def list_files(self) -> List[str]:
         """List all stored filenames"""
-        return list(self.data['files'].keys())
+        return self.files.list_files()
+    
+    def stats(self) -> Dict[str, Any]:
+        """File memory and spill usage for monitoring"""
+        return {'backend': 'memory', **self.files.stats()}
 
+    def save_snapshot(self) -> bool:
+        """Write a local snapshot if anything changed since the last one"""
+        if not self.snapshot_path:
+            return False
+        with self._snapshot_lock:
+            # Read before snapshotting: a write racing with us only causes
+            # one extra snapshot later, never a missed one
+            mutations = self._mutations
+            if mutations == self._snapshot_mutations:
+                return False
+            try:
+                data, _, file_refs = self._snapshot()
+                del data['files']
+                size = write_snapshot(self.snapshot_path, data,
+                                      ((name, meta) for name, (meta, _) in file_refs.items()),
+                                      lambda filename: file_refs[filename][1]())
+                self._snapshot_mutations = mutations
+                logger.info(f"Snapshot written to {self.snapshot_path} ({size / 1024 / 1024:.2f}MB)")
+                return True
+            except Exception as e:
+                logger.error(f"Error writing snapshot {self.snapshot_path}: {e}")
+                return False
+    
+    def restore_snapshot(self, path: str) -> bool:
+        """Load collections from a snapshot; file content stays on disk until used"""
+        try:
+            start = time.monotonic()
+            data, manifest, blob_start = read_snapshot_index(path)
+            for key, value in data.items():
+                self.set_data(key, value)
+            segment = Segment.open_readonly(path)
+            self.files.clear()
+            for filename, entry in manifest.items():
+                meta = {k: v for k, v in entry.items() if k not in ('offset', 'length')}
+                self.files.attach(filename, meta, segment, blob_start + entry['offset'], entry['length'])
+            # Restored state is exactly what the snapshot already holds
+            self._snapshot_mutations = self._mutations
+            logger.info(f"Restored snapshot {path}: {len(data.get('posts', []))} posts, "
+                        f"{len(manifest)} files in {time.monotonic() - start:.3f}s")
+            return True
+        except Exception as e:
+            logger.error(f"Error restoring snapshot {path}: {e}")
+            return False
+    
+    def _snapshot_loop(self):
+        """Background thread to write periodic local snapshots"""
+        while True:
+            time.sleep(self.snapshot_interval)
+            self.save_snapshot()
+    
     def force_backup(self):
         """Force an immediate backup"""
         if self.backup_url:
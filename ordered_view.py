@@ -0,0 +1,36 @@
+"""
+Ordered Views for Skibidi Hub
+
+Collections in memory storage are appended oldest-first; these views expose
+them newest-first without sorting or copying.
+"""
+
+from collections.abc import Sequence
+from typing import Any, List
+
+
+class NewestFirstView(Sequence):
+    """Read-only newest-first view over an oldest-first list.
+
+    Slicing only materializes the requested items, so paginated reads cost
+    O(page) instead of a full sort and copy of the collection.
+    """
+
+    def __init__(self, items: List[Any]):
+        self._items = items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        size = len(self._items)
+        if isinstance(index, slice):
+            return [self._items[size - 1 - i] for i in range(*index.indices(size))]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('view index out of range')
+        return self._items[size - 1 - index]
+
+    def __iter__(self):
+        return reversed(self._items)
@@ -0,0 +1,48 @@
+"""
+Rendered Page Cache for Skibidi Hub
+
+Keeps recently rendered HTML for read-heavy pages. Each entry remembers the
+storage generations of the collections it was rendered from; a lookup only
+hits while all of them are unchanged, so writes invalidate affected pages
+without any explicit purge.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class PageCache:
+    """Bounded LRU of rendered pages validated by storage generations"""
+
+    def __init__(self, max_entries: int = 128):
+        """Initialize an empty cache holding at most max_entries pages"""
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._pages: 'OrderedDict[Hashable, Tuple[Tuple[Any, ...], str]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, generations: Tuple[Any, ...]) -> Optional[str]:
+        """Return the cached page if it was rendered from these generations"""
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is None or cached[0] != generations:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+    def put(self, key: Hashable, generations: Tuple[Any, ...], html: str) -> None:
+        """Store a rendered page, evicting the least recently used over the limit"""
+        with self._lock:
+            self._pages[key] = (generations, html)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and size for monitoring"""
+        return {'pages': len(self._pages), 'max_entries': self.max_entries,
+                'hits': self.hits, 'misses': self.misses}
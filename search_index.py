@@ -0,0 +1,94 @@
+"""
+Search Index for Skibidi Hub
+
+Tokenized inverted index over post text, maintained incrementally as records
+are inserted. Query words match indexed words by prefix, so partial words
+still find posts, and results come back newest-first with only the requested
+page of records materialized.
+"""
+
+import bisect
+import re
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class SearchResults(Sequence):
+    """Newest-first search matches, resolved to records only when accessed"""
+
+    def __init__(self, seqs: List[int], records: Dict[int, Dict[str, Any]]):
+        self._seqs = seqs
+        self._records = records
+
+    def __len__(self) -> int:
+        return len(self._seqs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._records[seq] for seq in self._seqs[index]]
+        return self._records[self._seqs[index]]
+
+    def __iter__(self):
+        return (self._records[seq] for seq in self._seqs)
+
+
+class SearchIndex:
+    """Inverted index from word tokens to record sequence ids"""
+
+    def __init__(self, fields: Tuple[str, ...]):
+        """Initialize an empty index over the given record fields"""
+        self.fields = fields
+        self._postings: Dict[str, Set[int]] = {}
+        self._vocabulary: List[str] = []  # sorted, for prefix lookups
+        self._records: Dict[int, Dict[str, Any]] = {}
+
+    def add(self, record: Dict[str, Any], keep_sorted: bool = True) -> None:
+        """Index a record; it must already carry its storage 'seq' id"""
+        seq = record['seq']
+        self._records[seq] = record
+        for field in self.fields:
+            for token in tokenize(record.get(field) or ''):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = set()
+                    if keep_sorted:
+                        bisect.insort(self._vocabulary, token)
+                postings.add(seq)
+
+    def rebuild(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Discard the index and re-index the given records"""
+        self._postings = {}
+        self._vocabulary = []
+        self._records = {}
+        for record in records:
+            self.add(record, keep_sorted=False)
+        self._vocabulary = sorted(self._postings)
+
+    def _prefix_matches(self, prefix: str) -> Set[int]:
+        """Union of postings for every indexed token starting with prefix"""
+        matches: Set[int] = set()
+        position = bisect.bisect_left(self._vocabulary, prefix)
+        while position < len(self._vocabulary):
+            token = self._vocabulary[position]
+            if not token.startswith(prefix):
+                break
+            matches |= self._postings[token]
+            position += 1
+        return matches
+
+    def search(self, query: str) -> SearchResults:
+        """Find records containing every query word (by prefix), newest first"""
+        matches = None
+        for token in sorted(set(tokenize(query)), key=len, reverse=True):
+            token_matches = self._prefix_matches(token)
+            matches = token_matches if matches is None else matches & token_matches
+            if not matches:
+                break
+        return SearchResults(sorted(matches or (), reverse=True), self._records)
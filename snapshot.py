@@ -0,0 +1,90 @@
+"""
+Local Snapshots for Skibidi Hub
+
+A snapshot is a single file that lets memory storage come back after a
+restart or cold start without anyone restoring it by hand:
+
+    MAGIC | 8-byte index length | JSON index | file blobs ...
+
+The JSON index holds every collection plus a file manifest that records where
+each file's bytes sit in the blob section. Restoring parses only the index;
+file content is read lazily (through ``mmap``) the first time it is requested,
+so restore time doesn't depend on how much media the snapshot holds.
+"""
+
+import json
+import os
+import struct
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+SNAPSHOT_MAGIC = b'SKIBIDI-SNAPSHOT-1\n'
+_INDEX_LENGTH = struct.Struct('>Q')
+
+
+def write_snapshot(path: str, data: Dict[str, Any],
+                   files: Iterable[Tuple[str, Dict[str, Any]]],
+                   read_content: Callable[[str], Optional[bytes]]) -> int:
+    """
+    Atomically write a snapshot file
+
+    Args:
+        path: Snapshot file path (replaced via a temporary file)
+        data: Collections to store in the index (files excluded)
+        files: (filename, metadata) pairs; metadata must include 'sha256'
+        read_content: Returns a file's bytes given its filename
+
+    Returns:
+        int: Size of the written snapshot in bytes
+    """
+    # Lay out the blob section first: each distinct content hash is stored
+    # once, so the index can be written before any blob
+    manifest = {}
+    blob_sources = {}
+    blob_offsets = {}
+    offset = 0
+    for filename, meta in files:
+        sha256 = meta['sha256']
+        if sha256 not in blob_offsets:
+            blob_offsets[sha256] = offset
+            blob_sources[sha256] = filename
+            offset += meta['size']
+        manifest[filename] = {**meta, 'offset': blob_offsets[sha256], 'length': meta['size']}
+
+    index = json.dumps({'data': data, 'files': manifest}, default=str).encode('utf-8')
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(_INDEX_LENGTH.pack(len(index)))
+            f.write(index)
+            for sha256, filename in blob_sources.items():
+                content = read_content(filename) or b''
+                if len(content) != manifest[filename]['length']:
+                    raise ValueError(f"Content of {filename} changed while writing snapshot")
+                f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    # Replacing keeps any mapping of the previous snapshot valid
+    os.replace(temp_path, path)
+    return size
+
+
+def read_snapshot_index(path: str) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]], int]:
+    """
+    Read a snapshot's index without touching its blob section
+
+    Returns:
+        (collections, file manifest, absolute offset of the blob section)
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a Skibidi Hub snapshot")
+        (index_length,) = _INDEX_LENGTH.unpack(f.read(_INDEX_LENGTH.size))
+        index = json.loads(f.read(index_length))
+    blob_start = len(SNAPSHOT_MAGIC) + _INDEX_LENGTH.size + index_length
+    return index['data'], index['files'], blob_start
@@ -0,0 +1,570 @@
+"""
+SQLite Storage Service for Skibidi Hub
+
+Drop-in alternative to memory storage that keeps every collection, like,
+comment and file in one SQLite database. The database runs in WAL mode, so
+all gunicorn workers on a host share one dataset: readers never block each
+other or the single writer, and each worker can serve reads on its own core.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from search_index import tokenize
+from storage_backend import COLLECTIONS, ENGAGEMENT_KINDS, ORDERED_KEYS, SEARCH_FIELDS
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    # Records of every collection; 'seq' doubles as the insertion sequence id
+    """CREATE TABLE IF NOT EXISTS records (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        collection TEXT NOT NULL,
+        id TEXT,
+        timestamp TEXT NOT NULL DEFAULT '',
+        body TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS records_by_order ON records (collection, timestamp, seq)",
+    "CREATE INDEX IF NOT EXISTS records_by_id ON records (collection, id)",
+    # Row counts kept alongside writes, so counts never scan
+    """CREATE TABLE IF NOT EXISTS counters (
+        kind TEXT NOT NULL,
+        key TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (kind, key)
+    ) WITHOUT ROWID""",
+    # Usernames are interned once, like LikeStore does in memory
+    "CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, username TEXT NOT NULL UNIQUE)",
+    """CREATE TABLE IF NOT EXISTS likes (
+        post_id TEXT NOT NULL,
+        user_id INTEGER NOT NULL REFERENCES users (id),
+        PRIMARY KEY (post_id, user_id)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS comments (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        post_id TEXT NOT NULL,
+        body TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS comments_by_post ON comments (post_id, seq)",
+    """CREATE TABLE IF NOT EXISTS files (
+        filename TEXT PRIMARY KEY,
+        content_type TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        sha256 TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        content BLOB NOT NULL
+    )""",
+    # Contentless full-text index over posts; rowid is the record's seq
+    """CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+        content, username, content='', tokenize="unicode61 tokenchars '_'"
+    )""",
+)
+
+
+def _decode_record(seq: int, body: str) -> Dict[str, Any]:
+    """Rebuild a stored record, including its sequence id"""
+    record = json.loads(body)
+    record['seq'] = seq
+    return record
+
+
+def _decode_comment(seq: int, body: str) -> Dict[str, Any]:
+    """Rebuild a stored comment"""
+    return json.loads(body)
+
+
+def _match_query(query: str) -> str:
+    """FTS5 query requiring every word of the search, each matched by prefix"""
+    return ' AND '.join(f'"{token}"*' for token in sorted(set(tokenize(query))))
+
+
+class QueryView(Sequence):
+    """Lazy sequence over the rows of a query.
+
+    ``len()`` runs the count query and slices become LIMIT/OFFSET queries, so
+    paginated reads only load the requested page, as with memory storage's
+    newest-first views.
+    """
+
+    def __init__(self, storage: 'SQLiteStorage', count_sql: str, select_sql: str,
+                 params: Tuple[Any, ...], decode: Callable[[int, str], Dict[str, Any]]):
+        self._storage = storage
+        self._count_sql = count_sql
+        self._select_sql = select_sql
+        self._params = params
+        self._decode = decode
+
+    def __len__(self) -> int:
+        row = self._storage._connection().execute(self._count_sql, self._params).fetchone()
+        return row[0] if row else 0
+
+    def _page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Load up to limit rows starting at offset"""
+        rows = self._storage._connection().execute(
+            f'{self._select_sql} LIMIT ? OFFSET ?', (*self._params, limit, offset))
+        return [self._decode(*row) for row in rows]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return self._page(start, stop - start) if stop > start else []
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        page = self._page(index, 1) if index >= 0 else []
+        if not page:
+            raise IndexError('view index out of range')
+        return page[0]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # One statement reads one consistent snapshot of the database
+        rows = self._storage._connection().execute(self._select_sql, self._params)
+        return (self._decode(*row) for row in rows)
+
+
+class SQLiteLikes:
+    """Read side of the likes table, shaped like LikeStore"""
+
+    def __init__(self, storage: 'SQLiteStorage'):
+        self._storage = storage
+
+    def count(self, post_id: str) -> int:
+        """Number of likes on a post (kept in the counters table)"""
+        return self._storage._count('likes', post_id)
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """Export likes as {post_id: [username, ...]}"""
+        likes: Dict[str, List[str]] = {}
+        rows = self._storage._connection().execute(
+            "SELECT likes.post_id, users.username FROM likes JOIN users ON users.id = likes.user_id")
+        for post_id, username in rows:
+            likes.setdefault(post_id, []).append(username)
+        return likes
+
+
+class SQLiteComments:
+    """Read side of the comments table, shaped like CommentStore"""
+
+    def __init__(self, storage: 'SQLiteStorage'):
+        self._storage = storage
+
+    def count(self, post_id: str) -> int:
+        """Number of comments on a post (kept in the counters table)"""
+        return self._storage._count('comments', post_id)
+
+    def newest_first(self, post_id: str) -> QueryView:
+        """Newest-first view of a post's comments; slices read one page"""
+        return QueryView(self._storage,
+                         "SELECT count FROM counters WHERE kind = 'comments' AND key = ?",
+                         "SELECT seq, body FROM comments WHERE post_id = ? ORDER BY seq DESC",
+                         (post_id,), _decode_comment)
+
+    def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Export comments as {post_id: [comment, ...]} in insertion order"""
+        comments: Dict[str, List[Dict[str, Any]]] = {}
+        rows = self._storage._connection().execute(
+            "SELECT post_id, seq, body FROM comments ORDER BY post_id, seq")
+        for post_id, seq, body in rows:
+            comments.setdefault(post_id, []).append(_decode_comment(seq, body))
+        return comments
+
+
+class SQLiteStorage:
+    """SQLite storage exposing the same surface as MemoryStorage.
+
+    Each thread of each process uses its own connection. Writes run in
+    ``BEGIN IMMEDIATE`` transactions, so concurrent workers queue for the
+    write lock instead of failing halfway through, and multi-row reads run
+    in one read transaction so they see a single point in time.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (creating if needed) the database
+
+        Args:
+            path: Database file shared by every worker on the host
+        """
+        self.path = path
+        self._local = threading.local()
+        self.likes = SQLiteLikes(self)
+        self.comments = SQLiteComments(self)
+        with self._transaction() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+        logger.info(f"Using SQLite storage at {path}")
+
+    def _connection(self):
+        """This thread's connection, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            # isolation_level=None: transactions are opened explicitly
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def _transaction(self, write: bool = True):
+        """Run a block in one transaction; nested blocks join the outer one"""
+        conn = self._connection()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+        conn.execute('BEGIN IMMEDIATE' if write else 'BEGIN')
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+        finally:
+            self._local.depth = 0
+
+    def _count(self, kind: str, key: str) -> int:
+        """Read a maintained row count"""
+        row = self._connection().execute(
+            "SELECT count FROM counters WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _bump(conn, kind: str, key: str, amount: int) -> int:
+        """Adjust a maintained row count, returning the new value"""
+        conn.execute(
+            "INSERT INTO counters (kind, key, count) VALUES (?, ?, ?) "
+            "ON CONFLICT (kind, key) DO UPDATE SET count = count + excluded.count",
+            (kind, key, amount))
+        return conn.execute(
+            "SELECT count FROM counters WHERE kind = ? AND key = ?", (kind, key)).fetchone()[0]
+
+    def _touch(self, conn, key: str) -> None:
+        """Bump a collection's generation inside the writing transaction"""
+        # The first write seeds the counter from the clock, so a recreated
+        # database never reuses the generations of an earlier one
+        conn.execute(
+            "INSERT INTO counters (kind, key, count) VALUES ('generation', ?, ?) "
+            "ON CONFLICT (kind, key) DO UPDATE SET count = count + 1",
+            (key, time.time_ns()))
+
+    def generation(self, key: str) -> int:
+        """Counter that changes whenever any worker writes to the collection"""
+        return self._count('generation', key)
+
+    def get_data(self, key: str, default: Any = None) -> Any:
+        """Get a whole collection (oldest first) or the likes/comments/files mapping"""
+        if key == 'likes':
+            return self.likes.to_dict()
+        if key == 'comments':
+            return self.comments.to_dict()
+        if key == 'files':
+            rows = self._connection().execute(
+                "SELECT filename, content_type, size, sha256, timestamp FROM files")
+            return {name: {'content_type': content_type, 'size': size,
+                           'sha256': sha256, 'timestamp': timestamp}
+                    for name, content_type, size, sha256, timestamp in rows}
+        rows = self._connection().execute(
+            f"SELECT seq, body FROM records WHERE collection = ? ORDER BY {self._order_by(key)}",
+            (key,)).fetchall()
+        if not rows:
+            return default if default is not None else []
+        return [_decode_record(seq, body) for seq, body in rows]
+
+    def set_data(self, key: str, value: Any) -> bool:
+        """Replace a whole collection"""
+        try:
+            with self._transaction() as conn:
+                self._touch(conn, key)
+                if key == 'likes':
+                    conn.execute("DELETE FROM likes")
+                    conn.execute("DELETE FROM counters WHERE kind = 'likes'")
+                    for post_id, usernames in value.items():
+                        for username in set(usernames):
+                            self._add_like(conn, post_id, username)
+                    return True
+                if key == 'comments':
+                    conn.execute("DELETE FROM comments")
+                    conn.execute("DELETE FROM counters WHERE kind = 'comments'")
+                    for post_id, comments in value.items():
+                        for comment in sorted(comments, key=lambda c: c.get('timestamp', '')):
+                            self._insert_comment(conn, post_id, comment)
+                    return True
+                if key == 'files':
+                    conn.execute("DELETE FROM files")
+                    for name, file_data in value.items():
+                        content = file_data.get('content', b'')
+                        if isinstance(content, str):
+                            content = base64.b64decode(content)
+                        self._put_file(conn, name, content, file_data.get('content_type'),
+                                       file_data.get('timestamp'))
+                    return True
+                conn.execute("DELETE FROM records WHERE collection = ?", (key,))
+                conn.execute("DELETE FROM counters WHERE kind = 'records' AND key = ?", (key,))
+                if key in SEARCH_FIELDS:
+                    conn.execute(f"INSERT INTO {key}_fts ({key}_fts) VALUES ('delete-all')")
+                if key in ORDERED_KEYS:
+                    value = sorted(value, key=lambda item: item.get('timestamp', ''))
+                for item in value:
+                    self._insert_record(conn, key, item)
+                return True
+        except Exception as e:
+            logger.error(f"Error setting data for key {key}: {e}")
+            return False
+
+    def append_data(self, key: str, item: Any) -> bool:
+        """Append item to a collection"""
+        try:
+            with self._transaction() as conn:
+                self._insert_record(conn, key, item)
+            return True
+        except Exception as e:
+            logger.error(f"Error appending data to key {key}: {e}")
+            return False
+
+    def insert_ordered(self, key: str, item: Dict[str, Any]) -> bool:
+        """Insert a record into an ordered collection (the index keeps timestamp order)"""
+        return self.append_data(key, item)
+
+    def _insert_record(self, conn, key: str, item: Dict[str, Any]) -> None:
+        """Insert one record, assigning its seq and indexing it for search"""
+        body = json.dumps({k: v for k, v in item.items() if k != 'seq'}, default=str)
+        cursor = conn.execute(
+            "INSERT INTO records (collection, id, timestamp, body) VALUES (?, ?, ?, ?)",
+            (key, item.get('id'), item.get('timestamp', ''), body))
+        item['seq'] = cursor.lastrowid
+        self._bump(conn, 'records', key, 1)
+        self._touch(conn, key)
+        fields = SEARCH_FIELDS.get(key)
+        if fields:
+            conn.execute(
+                f"INSERT INTO {key}_fts (rowid, {', '.join(fields)}) "
+                f"VALUES (?, {', '.join('?' for _ in fields)})",
+                (item['seq'], *(item.get(field) or '' for field in fields)))
+
+    def get_record(self, key: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a record by id through the (collection, id) index"""
+        row = self._connection().execute(
+            "SELECT seq, body FROM records WHERE collection = ? AND id = ? LIMIT 1",
+            (key, record_id)).fetchone()
+        return _decode_record(*row) if row else None
+
+    def increment(self, key: str, item: Dict[str, Any], field: str, amount: int = 1) -> int:
+        """Atomically add to a numeric field of a stored record, returning the new value"""
+        path = f'$.{field}'
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE records SET body = json_set(body, ?, COALESCE(json_extract(body, ?), 0) + ?) "
+                "WHERE seq = ?", (path, path, amount, item['seq']))
+            self._touch(conn, key)
+            row = conn.execute("SELECT json_extract(body, ?) FROM records WHERE seq = ?",
+                               (path, item['seq'])).fetchone()
+        item[field] = row[0] if row else item.get(field, 0) + amount
+        return item[field]
+
+    def toggle_like(self, post_id: str, username: str):
+        """Toggle a like, returning the action taken and the new like count"""
+        with self._transaction() as conn:
+            self._touch(conn, 'likes')
+            user_id = self._intern(conn, username)
+            removed = conn.execute("DELETE FROM likes WHERE post_id = ? AND user_id = ?",
+                                   (post_id, user_id)).rowcount
+            if removed:
+                return 'unliked', self._bump(conn, 'likes', post_id, -1)
+            return 'liked', self._add_like(conn, post_id, username, user_id)
+
+    def _add_like(self, conn, post_id: str, username: str, user_id: Optional[int] = None) -> int:
+        """Record a like, returning the new like count"""
+        if user_id is None:
+            user_id = self._intern(conn, username)
+        conn.execute("INSERT INTO likes (post_id, user_id) VALUES (?, ?)", (post_id, user_id))
+        return self._bump(conn, 'likes', post_id, 1)
+
+    @staticmethod
+    def _intern(conn, username: str) -> int:
+        """Return the integer id for a username, assigning one if needed"""
+        conn.execute("INSERT OR IGNORE INTO users (username) VALUES (?)", (username,))
+        return conn.execute("SELECT id FROM users WHERE username = ?", (username,)).fetchone()[0]
+
+    def add_comment(self, post_id: str, comment: Dict[str, Any]) -> bool:
+        """Append a comment to a post"""
+        try:
+            with self._transaction() as conn:
+                self._insert_comment(conn, post_id, comment)
+            return True
+        except Exception as e:
+            logger.error(f"Error adding comment to post {post_id}: {e}")
+            return False
+
+    def engagement(self, key: str, kinds: Tuple[str, ...] = ENGAGEMENT_KINDS) -> Dict[str, Dict[str, Any]]:
+        """Timestamp and engagement counts of every record in a collection that has any"""
+        counters = [kind for kind in kinds if kind in ('likes', 'comments')]
+        engagement: Dict[str, Dict[str, Any]] = {}
+
+        def entry(record_id: str, timestamp: str) -> Dict[str, Any]:
+            return engagement.setdefault(record_id, {'timestamp': timestamp, **dict.fromkeys(kinds, 0)})
+
+        with self._transaction(write=False) as conn:
+            # Like and comment counts come straight from the counters table,
+            # joined to the engaged records only; no record body is decoded
+            if counters:
+                rows = conn.execute(
+                    "SELECT records.id, records.timestamp, counters.kind, counters.count FROM counters "
+                    "JOIN records ON records.collection = ? AND records.id = counters.key "
+                    f"WHERE counters.kind IN ({', '.join('?' for _ in counters)}) AND counters.count > 0",
+                    (key, *counters))
+                for record_id, timestamp, kind, count in rows:
+                    entry(record_id, timestamp)[kind] = count
+            # Views live in the record body, so they cost a scan of the collection
+            if 'views' in kinds:
+                rows = conn.execute(
+                    "SELECT id, timestamp, json_extract(body, '$.views') FROM records "
+                    "WHERE collection = ? AND id IS NOT NULL AND json_extract(body, '$.views') > 0", (key,))
+                for record_id, timestamp, views in rows:
+                    entry(record_id, timestamp)['views'] = views
+        return engagement
+
+    def _insert_comment(self, conn, post_id: str, comment: Dict[str, Any]) -> None:
+        """Insert one comment and bump the post's comment count"""
+        conn.execute("INSERT INTO comments (post_id, body) VALUES (?, ?)",
+                     (post_id, json.dumps(comment, default=str)))
+        self._bump(conn, 'comments', post_id, 1)
+        self._touch(conn, 'comments')
+
+    @staticmethod
+    def _order_by(key: str) -> str:
+        """ORDER BY clause listing a collection oldest first"""
+        return 'timestamp, seq' if key in ORDERED_KEYS else 'seq'
+
+    def get_ordered(self, key: str) -> QueryView:
+        """Get a newest-first view of an ordered collection; slices read one page"""
+        return QueryView(self,
+                         "SELECT count FROM counters WHERE kind = 'records' AND key = ?",
+                         "SELECT seq, body FROM records WHERE collection = ? "
+                         "ORDER BY timestamp DESC, seq DESC",
+                         (key,), _decode_record)
+
+    def ordered_page(self, key: str, before: Optional[Tuple[str, int]], limit: int) -> List[Dict[str, Any]]:
+        """Up to limit records newest first, strictly older than a (timestamp, seq) position"""
+        # Seeks through the (collection, timestamp, seq) index, no OFFSET scan
+        if before is None:
+            rows = self._connection().execute(
+                "SELECT seq, body FROM records WHERE collection = ? "
+                "ORDER BY timestamp DESC, seq DESC LIMIT ?", (key, limit))
+        else:
+            rows = self._connection().execute(
+                "SELECT seq, body FROM records WHERE collection = ? AND (timestamp, seq) < (?, ?) "
+                "ORDER BY timestamp DESC, seq DESC LIMIT ?", (key, before[0], before[1], limit))
+        return [_decode_record(seq, body) for seq, body in rows]
+
+    def search(self, key: str, query: str) -> QueryView:
+        """Search an indexed collection, returning lazy newest-first matches"""
+        match = _match_query(query)
+        if key not in SEARCH_FIELDS or not match:
+            return QueryView(self, "SELECT 0", "SELECT seq, body FROM records WHERE 0", (), _decode_record)
+        return QueryView(self,
+                         f"SELECT COUNT(*) FROM {key}_fts WHERE {key}_fts MATCH ?",
+                         f"SELECT records.seq, records.body FROM {key}_fts "
+                         f"JOIN records ON records.seq = {key}_fts.rowid "
+                         f"WHERE {key}_fts MATCH ? ORDER BY {key}_fts.rowid DESC",
+                         (match,), _decode_record)
+
+    def get_all_data(self) -> Dict[str, Any]:
+        """Get a consistent point-in-time copy of all data (file metadata only)"""
+        with self._transaction(write=False) as conn:
+            keys = {row[0] for row in conn.execute("SELECT DISTINCT collection FROM records")}
+            all_data = {key: self.get_data(key) for key in sorted(keys.union(COLLECTIONS))}
+            for key in ('likes', 'comments', 'files'):
+                all_data[key] = self.get_data(key)
+            return all_data
+
+    def store_file(self, file_content: bytes, filename: str, content_type: Optional[str] = None) -> bool:
+        """Store raw file content in the files table"""
+        try:
+            with self._transaction() as conn:
+                self._put_file(conn, filename, bytes(file_content), content_type)
+                self._touch(conn, 'files')
+            logger.info(f"File stored in SQLite: {filename} ({len(file_content)} bytes)")
+            return True
+        except Exception as e:
+            logger.error(f"Error storing file {filename}: {e}")
+            return False
+
+    @staticmethod
+    def _put_file(conn, filename: str, content: bytes, content_type: Optional[str],
+                  timestamp: Optional[str] = None) -> None:
+        """Insert or replace one file row"""
+        conn.execute(
+            "INSERT OR REPLACE INTO files (filename, content_type, size, sha256, timestamp, content) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (filename, content_type or 'application/octet-stream', len(content),
+             hashlib.sha256(content).hexdigest(), timestamp or datetime.now().isoformat(), content))
+
+    def get_file(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Get file metadata (content type, size, timestamp)"""
+        row = self._connection().execute(
+            "SELECT content_type, size, sha256, timestamp FROM files WHERE filename = ?",
+            (filename,)).fetchone()
+        if row is None:
+            return None
+        content_type, size, sha256, timestamp = row
+        return {'content_type': content_type, 'size': size, 'sha256': sha256, 'timestamp': timestamp}
+
+    def get_file_content(self, filename: str) -> Optional[bytes]:
+        """Get file content as bytes"""
+        try:
+            row = self._connection().execute(
+                "SELECT content FROM files WHERE filename = ?", (filename,)).fetchone()
+            return bytes(row[0]) if row else None
+        except Exception as e:
+            logger.error(f"Error reading file {filename}: {e}")
+            return None
+
+    def delete_file(self, filename: str) -> bool:
+        """Delete file from the database"""
+        with self._transaction() as conn:
+            deleted = conn.execute("DELETE FROM files WHERE filename = ?", (filename,)).rowcount
+            if deleted:
+                self._touch(conn, 'files')
+        if deleted:
+            logger.info(f"File deleted from SQLite: {filename}")
+        return bool(deleted)
+
+    def list_files(self) -> List[str]:
+        """List all stored filenames"""
+        return [row[0] for row in self._connection().execute("SELECT filename FROM files")]
+
+    def stats(self) -> Dict[str, Any]:
+        """File count, content bytes and database size for monitoring"""
+        count, total = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files").fetchone()
+        return {
+            'backend': 'sqlite',
+            'database_path': self.path,
+            'database_bytes': os.path.getsize(self.path),
+            'files': count,
+            'content_bytes': total,
+        }
+
+    def force_backup(self):
+        """The database file is the durable copy; remote backups are memory-storage only"""
+        logger.warning("Remote backups are not used with SQLite storage")
@@ -0,0 +1,145 @@
+"""
+Storage Backend Interface for Skibidi Hub
+
+Routes talk to storage only through the ``StorageBackend`` protocol below, so
+the backend can be picked per deployment with STORAGE_BACKEND:
+
+    memory       In-process dictionaries with URL backups (default)
+    sqlite       One WAL-mode SQLite file shared by every worker (SQLITE_PATH)
+    vercel_blob  JSON collections and uploads kept in Vercel Blob
+"""
+
+import os
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Tuple, runtime_checkable
+
+BACKENDS = ('memory', 'sqlite', 'vercel_blob')
+
+# Collections always present in exports, even when empty
+COLLECTIONS = ('posts', 'hall_of_fame', 'hall_of_shame', 'videos')
+
+# Collections read newest-first by timestamp; others keep insertion order
+ORDERED_KEYS = ('posts', 'videos')
+
+# Collections with a search index, and the record fields it covers
+SEARCH_FIELDS = {'posts': ('content', 'username')}
+
+# Per-record engagement counts a bulk engagement read can report
+ENGAGEMENT_KINDS = ('likes', 'comments', 'views')
+
+
+def order_key(item: Dict[str, Any]) -> Tuple[str, int]:
+    """Sort key for ordered collections: timestamp, then insertion sequence"""
+    return (item.get('timestamp', ''), item.get('seq', 0))
+
+
+class LikeCounts(Protocol):
+    """Per-post like counts"""
+
+    def count(self, post_id: str) -> int: ...
+
+
+class CommentPages(Protocol):
+    """Per-post comment counts and newest-first pages"""
+
+    def count(self, post_id: str) -> int: ...
+
+    def newest_first(self, post_id: str) -> Sequence: ...
+
+
+@runtime_checkable
+class StorageBackend(Protocol):
+    """Collections (posts, videos, halls, likes, comments) plus file blobs"""
+
+    likes: LikeCounts
+    comments: CommentPages
+
+    # Whole collections
+    def get_data(self, key: str, default: Any = None) -> Any: ...
+
+    def set_data(self, key: str, value: Any) -> bool: ...
+
+    def append_data(self, key: str, item: Any) -> bool: ...
+
+    def get_all_data(self) -> Dict[str, Any]: ...
+
+    # Ordered collections and records
+    def insert_ordered(self, key: str, item: Dict[str, Any]) -> bool: ...
+
+    def get_ordered(self, key: str) -> Sequence: ...
+
+    def ordered_page(self, key: str, before: Optional[Tuple[str, int]], limit: int) -> List[Dict[str, Any]]: ...
+
+    def search(self, key: str, query: str) -> Sequence: ...
+
+    def get_record(self, key: str, record_id: str) -> Optional[Dict[str, Any]]: ...
+
+    def increment(self, key: str, item: Dict[str, Any], field: str, amount: int = 1) -> int: ...
+
+    # Likes and comments
+    def toggle_like(self, post_id: str, username: str) -> Tuple[str, int]: ...
+
+    def add_comment(self, post_id: str, comment: Dict[str, Any]) -> bool: ...
+
+    def engagement(self, key: str, kinds: Tuple[str, ...] = ENGAGEMENT_KINDS) -> Dict[str, Dict[str, Any]]: ...
+
+    # File blobs
+    def store_file(self, file_content: bytes, filename: str, content_type: Optional[str] = None) -> bool: ...
+
+    def get_file(self, filename: str) -> Optional[Dict[str, Any]]: ...
+
+    def get_file_content(self, filename: str) -> Optional[bytes]: ...
+
+    def delete_file(self, filename: str) -> bool: ...
+
+    def list_files(self) -> List[str]: ...
+
+    # Operations
+    def generation(self, key: str) -> Any: ...
+
+    def stats(self) -> Dict[str, Any]: ...
+
+    def force_backup(self) -> None: ...
+
+
+def record_engagement(records: Iterable[Dict[str, Any]], likes: LikeCounts, comments: CommentPages,
+                      kinds: Tuple[str, ...]) -> Dict[str, Dict[str, Any]]:
+    """Engagement of records with any, from like and comment stores and each record's views"""
+    engagement = {}
+    for record in records:
+        record_id = record.get('id')
+        counts = {}
+        for kind in kinds:
+            if kind == 'likes':
+                counts[kind] = likes.count(record_id)
+            elif kind == 'comments':
+                counts[kind] = comments.count(record_id)
+            else:
+                counts[kind] = record.get(kind) or 0
+        if record_id is not None and any(counts.values()):
+            engagement[record_id] = {'timestamp': record.get('timestamp', ''), **counts}
+    return engagement
+
+
+def create_storage(backend: Optional[str] = None) -> StorageBackend:
+    """
+    Build the configured storage backend
+
+    Args:
+        backend: Backend name (defaults to STORAGE_BACKEND, then 'memory')
+
+    Returns:
+        StorageBackend: The backend instance routes should use
+    """
+    backend = backend or os.environ.get('STORAGE_BACKEND', 'memory')
+    # Imported lazily: each backend sets itself up on import or construction
+    if backend == 'memory':
+        from memory_storage import memory_storage
+        return memory_storage
+    if backend == 'sqlite':
+        from sqlite_storage import SQLiteStorage
+        return SQLiteStorage(os.environ.get('SQLITE_PATH', 'skibidi_hub.db'))
+    if backend == 'vercel_blob':
+        from storage_service import VercelBlobStorage
+        return VercelBlobStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND {backend!r}, expected one of {', '.join(BACKENDS)}")
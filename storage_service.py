@@ -8,20 +8,80 @@ cloud-based blob storage.
 
 import os
 import json
+import base64
 import logging
-from typing import Dict, List, Optional, Any, Union
-import vercel_blob
+import mimetypes
+import requests
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple, Union
 from io import BytesIO
+from requests.adapters import HTTPAdapter
+
+from blob_cache import BlobCache
+from blob_migration import BlobMigration
+from comment_store import CommentStore
+from like_store import LikeStore
+from ordered_view import NewestFirstView
+from search_index import SearchIndex, SearchResults
+from storage_backend import COLLECTIONS, ENGAGEMENT_KINDS, SEARCH_FIELDS, order_key, record_engagement
+
+try:
+    import vercel_blob
+except ImportError:  # only needed when this backend is selected
+    vercel_blob = None
+
+# Collections kept as lists (data/<key>.json); everything else is a JSON object
+LIST_KEYS = COLLECTIONS
+
+# Blob entries kept in process, and seconds before one is revalidated
+BLOB_CACHE_SIZE = int(os.environ.get('BLOB_CACHE_SIZE', '256'))
+BLOB_CACHE_TTL = float(os.environ.get('BLOB_CACHE_TTL', '5'))
+
+# Keep-alive connections per blob host for downloads
+BLOB_HTTP_POOL_SIZE = int(os.environ.get('BLOB_HTTP_POOL_SIZE', '16'))
+BLOB_HTTP_TIMEOUT = 30
+
+# Local-to-blob migration: concurrent uploads and checkpoint manifest
+MIGRATION_WORKERS = int(os.environ.get('MIGRATION_WORKERS', '8'))
+MIGRATION_MANIFEST = os.environ.get('MIGRATION_MANIFEST', 'blob_migration_manifest.json')
 
 
 class VercelBlobStorage:
-    """Vercel Blob Storage abstraction layer"""
+    """Vercel Blob Storage abstraction layer.
+
+    Collections are whole JSON blobs, so every write is a read-modify-write
+    of one blob and concurrent writers can overwrite each other. Suits
+    low-write deployments where memory is scarce and instances are short-lived.
+    """
     
-    def __init__(self):
-        """Initialize storage service with environment token"""
-        self.token = os.environ.get("BLOB_READ_WRITE_TOKEN")
-        if not self.token:
-            logging.warning("BLOB_READ_WRITE_TOKEN not found in environment variables")
+    def __init__(self, client: Any = None):
+        """
+        Initialize storage service
+        
+        Args:
+            client: Blob API exposing put/list/head/delete (defaults to the
+                vercel_blob module, authenticated by BLOB_READ_WRITE_TOKEN)
+        """
+        if client is None:
+            if vercel_blob is None:
+                raise ImportError("vercel_blob is required for the vercel_blob storage backend")
+            client = vercel_blob
+            self.token = os.environ.get("BLOB_READ_WRITE_TOKEN")
+            if not self.token:
+                logging.warning("BLOB_READ_WRITE_TOKEN not found in environment variables")
+        else:
+            self.token = None
+        self.client = client
+        
+        # Downloads reuse pooled keep-alive connections instead of a new
+        # connection (and TLS handshake) per request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=BLOB_HTTP_POOL_SIZE, pool_maxsize=BLOB_HTTP_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Blob URLs, upload metadata and JSON documents seen by this process
+        self.cache = BlobCache(max_entries=BLOB_CACHE_SIZE, ttl=BLOB_CACHE_TTL)
     
     def put_json_data(self, file_key: str, data: Dict[str, Any]) -> bool:
         """
@@ -39,11 +99,13 @@ class VercelBlobStorage:
             json_bytes = json_content.encode('utf-8')
             
             blob_name = f"data/{file_key}.json"
-            response = vercel_blob.put(blob_name, json_bytes, {
+            response = self.client.put(blob_name, json_bytes, {
                 'allowOverwrite': True
             }, verbose=True)
             
             if response and 'url' in response:
+                # Our own write is the current content: reads need no download
+                self.cache.set_content(blob_name, response['url'], json_bytes)
                 logging.info(f"Successfully stored JSON data: {blob_name}")
                 return True
             else:
@@ -66,36 +128,86 @@ class VercelBlobStorage:
             Parsed JSON data or default value
         """
         try:
-            blob_name = f"data/{file_key}.json"
-            
-            # List blobs to check if file exists
-            blobs_response = vercel_blob.list({'prefix': blob_name, 'limit': '1'})
-            
-            if not blobs_response.get('blobs') or len(blobs_response['blobs']) == 0:
-                logging.info(f"JSON data file not found: {blob_name}, returning default")
-                return default if default is not None else ([] if file_key in ['posts'] else {})
-            
-            # Get the blob URL and download content
-            blob_info = blobs_response['blobs'][0]
-            blob_url = blob_info['url']
-            
-            # Download the content using head to get metadata and download URL
-            metadata = vercel_blob.head(blob_url)
-            download_url = metadata.get('downloadUrl', blob_url)
-            
-            # For now, we'll use the direct URL since download_file needs local path
-            # In a production environment, you might want to implement proper streaming
-            import requests
-            response = requests.get(download_url)
-            response.raise_for_status()
-            
-            json_data = response.json()
-            logging.info(f"Successfully retrieved JSON data: {blob_name}")
+            json_data = self._read_json(file_key)
+            if json_data is None:
+                logging.info(f"JSON data file not found: data/{file_key}.json, returning default")
+                return default if default is not None else self._empty(file_key)
+            logging.info(f"Successfully retrieved JSON data: data/{file_key}.json")
             return json_data
             
         except Exception as e:
             logging.error(f"Error retrieving JSON data {file_key}: {e}")
-            return default if default is not None else ([] if file_key in ['posts', 'hall_of_fame', 'hall_of_shame', 'videos'] else {})
+            return default if default is not None else self._empty(file_key)
+    
+    def _read_json(self, file_key: str, revalidate: bool = False) -> Any:
+        """
+        Read a JSON data blob through the cache; None if it doesn't exist
+
+        Fresh cache entries cost no network call. Older ones (or any entry
+        when revalidate is set, as before a read-modify-write) are checked
+        with a conditional GET. Raises on network errors.
+        """
+        entry = self._current_entry(file_key, revalidate)
+        return None if entry is None else json.loads(entry.content)
+    
+    def _current_entry(self, file_key: str, revalidate: bool = False):
+        """
+        Make the cached bytes of a JSON data blob current without parsing them
+
+        Returns the cache entry holding the content, or None if the blob
+        doesn't exist. Raises on network errors.
+        """
+        blob_name = f"data/{file_key}.json"
+        entry = self.cache.get(blob_name)
+        if entry is not None and not revalidate and self.cache.is_fresh(entry):
+            if entry.url is None:
+                return None
+            if entry.content is not None:
+                return entry
+        
+        if entry is None or entry.url is None:
+            entry = self._resolve(blob_name)
+            if entry.url is None:
+                return None
+        
+        headers = {'If-None-Match': entry.etag} if entry.etag and entry.content is not None else {}
+        response = self.session.get(entry.url, headers=headers, timeout=BLOB_HTTP_TIMEOUT)
+        if response.status_code == 304:
+            self.cache.mark_checked(entry)
+            return entry
+        if response.status_code == 404:
+            # Replaced under a new URL (or deleted) by another instance
+            entry = self._resolve(blob_name)
+            if entry.url is None:
+                return None
+            response = self.session.get(entry.url, timeout=BLOB_HTTP_TIMEOUT)
+        response.raise_for_status()
+        return self.cache.set_content(blob_name, entry.url, response.content, response.headers.get('ETag'))
+    
+    def _resolve(self, blob_name: str):
+        """Look up a blob's URL with the blob service and cache the answer"""
+        blob_info = self._find_blob(blob_name)
+        return self.cache.set_url(blob_name, blob_info['url'] if blob_info else None)
+    
+    def _blob_url(self, blob_name: str) -> Optional[str]:
+        """Blob URL from the cache, listing only on a miss"""
+        entry = self.cache.get(blob_name)
+        if entry is None or (entry.url is None and not self.cache.is_fresh(entry)):
+            entry = self._resolve(blob_name)
+        return entry.url
+    
+    def _find_blob(self, blob_name: str) -> Optional[Dict[str, Any]]:
+        """Listing entry for the blob with exactly this pathname, if any"""
+        # The exact name sorts before any longer name sharing its prefix
+        blobs = self.client.list({'prefix': blob_name, 'limit': '1'}).get('blobs') or []
+        if blobs and blobs[0].get('pathname', blob_name) == blob_name:
+            return blobs[0]
+        return None
+    
+    @staticmethod
+    def _empty(file_key: str) -> Any:
+        """Empty value for a data file that doesn't exist yet"""
+        return [] if file_key in LIST_KEYS else {}
     
     def put_file(self, file_content: bytes, filename: str, content_type: Optional[str] = None) -> Optional[str]:
         """
@@ -117,7 +229,7 @@ class VercelBlobStorage:
             # Use multipart upload for larger files
             use_multipart = len(file_content) > 10 * 1024 * 1024  # 10MB threshold
             
-            response = vercel_blob.put(
+            response = self.client.put(
                 blob_name, 
                 file_content, 
                 {
@@ -128,6 +240,13 @@ class VercelBlobStorage:
             )
             
             if response and 'url' in response:
+                self.cache.set_meta(blob_name, response['url'], {
+                    'content_type': content_type or response.get('contentType')
+                                    or mimetypes.guess_type(clean_filename)[0] or 'application/octet-stream',
+                    'size': len(file_content),
+                    'timestamp': datetime.now().isoformat(),
+                    'url': response['url'],
+                })
                 logging.info(f"Successfully stored file: {blob_name}")
                 return response['url']
             else:
@@ -153,15 +272,10 @@ class VercelBlobStorage:
             clean_filename = filename.replace('uploads/', '') if filename.startswith('uploads/') else filename
             blob_name = f"uploads/{clean_filename}"
             
-            # List blobs to check if file exists
-            blobs_response = vercel_blob.list({'prefix': blob_name, 'limit': '1'})
-            
-            if not blobs_response.get('blobs') or len(blobs_response['blobs']) == 0:
+            blob_url = self._blob_url(blob_name)
+            if blob_url is None:
                 logging.warning(f"File not found: {blob_name}")
-                return None
-            
-            blob_info = blobs_response['blobs'][0]
-            return blob_info['url']
+            return blob_url
             
         except Exception as e:
             logging.error(f"Error getting file URL {filename}: {e}")
@@ -187,7 +301,8 @@ class VercelBlobStorage:
                 return False
             
             # Delete the blob
-            vercel_blob.delete([file_url])
+            self.client.delete([file_url])
+            self.cache.invalidate(blob_name)
             logging.info(f"Successfully deleted file: {blob_name}")
             return True
             
@@ -195,9 +310,9 @@ class VercelBlobStorage:
             logging.error(f"Error deleting file {filename}: {e}")
             return False
     
-    def list_files(self, prefix: str = "uploads/", limit: int = 100) -> List[Dict[str, Any]]:
+    def list_blobs(self, prefix: str = "uploads/", limit: int = 100) -> List[Dict[str, Any]]:
         """
-        List files in blob storage
+        List blobs in blob storage
         
         Args:
             prefix: Prefix to filter files
@@ -207,7 +322,7 @@ class VercelBlobStorage:
             List of file information dictionaries
         """
         try:
-            blobs_response = vercel_blob.list({
+            blobs_response = self.client.list({
                 'prefix': prefix,
                 'limit': str(limit)
             })
@@ -218,66 +333,264 @@ class VercelBlobStorage:
             logging.error(f"Error listing files with prefix {prefix}: {e}")
             return []
     
-    def migrate_local_data(self, local_data_folder: str = "data", local_upload_folder: str = "uploads") -> bool:
-        return True # comment that line to enable migration
+    # StorageBackend interface: collections are read-modify-writes of their
+    # JSON blob, uploads are blobs under uploads/
+    
+    @property
+    def likes(self) -> LikeStore:
+        """Likes loaded from blob storage, for per-post counts within a request"""
+        likes = LikeStore()
+        likes.load(self.get_json_data('likes', {}))
+        return likes
+    
+    @property
+    def comments(self) -> CommentStore:
+        """Comments loaded from blob storage, for counts and pages within a request"""
+        comments = CommentStore()
+        comments.load(self.get_json_data('comments', {}))
+        return comments
+    
+    def get_data(self, key: str, default: Any = None) -> Any:
+        """Get a collection (or likes/comments/files mapping) from blob storage"""
+        if key == 'files':
+            return {blob['pathname'][len('uploads/'):]: {'size': blob.get('size'),
+                                                         'timestamp': blob.get('uploadedAt')}
+                    for blob in self._iter_blobs('uploads/')}
+        return self.get_json_data(key, default)
+    
+    def set_data(self, key: str, value: Any) -> bool:
+        """Replace a collection; 'files' entries carry base64 or raw content"""
+        if key == 'files':
+            success = True
+            for name, file_data in value.items():
+                content = file_data.get('content', b'')
+                if isinstance(content, str):
+                    content = base64.b64decode(content)
+                success = self.store_file(content, name, file_data.get('content_type')) and success
+            return success
+        return self.put_json_data(key, value)
+    
+    def append_data(self, key: str, item: Any) -> bool:
+        """Append item to a collection blob"""
+        try:
+            items = self._read_json(key, revalidate=True) or []
+            items.append(item)
+            return self.put_json_data(key, items)
+        except Exception as e:
+            logging.error(f"Error appending data to key {key}: {e}")
+            return False
+    
+    def insert_ordered(self, key: str, item: Dict[str, Any]) -> bool:
+        """Append a record with the next sequence id; reads sort by timestamp"""
+        try:
+            items = self._read_json(key, revalidate=True) or []
+            item['seq'] = max((existing.get('seq', 0) for existing in items), default=0) + 1
+            items.append(item)
+            return self.put_json_data(key, items)
+        except Exception as e:
+            logging.error(f"Error inserting ordered data to key {key}: {e}")
+            return False
+    
+    def get_ordered(self, key: str) -> NewestFirstView:
+        """Get a newest-first view of an ordered collection"""
+        return NewestFirstView(sorted(self.get_json_data(key, []), key=order_key))
+    
+    def ordered_page(self, key: str, before: Optional[Tuple[str, int]], limit: int) -> List[Dict[str, Any]]:
+        """Up to limit records newest first, strictly older than a (timestamp, seq) position"""
+        items = self.get_ordered(key)
+        if before is not None:
+            items = [item for item in items if order_key(item) < tuple(before)]
+        return list(items[:limit])
+    
+    def search(self, key: str, query: str) -> SearchResults:
+        """Search a collection, returning newest-first matches"""
+        index = SearchIndex(SEARCH_FIELDS[key])
+        records = self.get_json_data(key, [])
+        for position, record in enumerate(records, 1):
+            record.setdefault('seq', position)
+        index.rebuild(records)
+        return index.search(query)
+    
+    def generation(self, key: str) -> Any:
+        """Identity of the collection document as last seen or revalidated"""
+        try:
+            # Only confirms the cached bytes are current; nothing is parsed
+            entry = self._current_entry(key)
+        except Exception as e:
+            logging.error(f"Error revalidating {key} for its generation: {e}")
+            entry = self.cache.get(f"data/{key}.json")
+        if entry is None or entry.content is None:
+            return None
+        # Hashed once per download or upload, and equal across workers
+        return entry.digest
+    
+    def get_record(self, key: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a record by id in the (cached) collection document"""
+        for record in self.get_json_data(key, []):
+            if record.get('id') == record_id:
+                return record
+        return None
+    
+    def increment(self, key: str, item: Dict[str, Any], field: str, amount: int = 1) -> int:
+        """Add to a numeric field of a stored record, returning the new value"""
+        items = self._read_json(key, revalidate=True) or []
+        for record in items:
+            if record.get('id') == item['id']:
+                record[field] = record.get(field, 0) + amount
+                item[field] = record[field]
+                break
+        else:
+            item[field] = item.get(field, 0) + amount
+        self.put_json_data(key, items)
+        return item[field]
+    
+    def toggle_like(self, post_id: str, username: str) -> Tuple[str, int]:
+        """Toggle a like, returning the action taken and the new like count"""
+        likes = self._read_json('likes', revalidate=True) or {}
+        likers = likes.setdefault(post_id, [])
+        if username in likers:
+            likers.remove(username)
+            action = 'unliked'
+        else:
+            likers.append(username)
+            action = 'liked'
+        self.put_json_data('likes', likes)
+        return action, len(likers)
+    
+    def add_comment(self, post_id: str, comment: Dict[str, Any]) -> bool:
+        """Append a comment to a post"""
+        try:
+            comments = self._read_json('comments', revalidate=True) or {}
+            comments.setdefault(post_id, []).append(comment)
+            return self.put_json_data('comments', comments)
+        except Exception as e:
+            logging.error(f"Error adding comment to post {post_id}: {e}")
+            return False
+    
+    def engagement(self, key: str, kinds: Tuple[str, ...] = ENGAGEMENT_KINDS) -> Dict[str, Dict[str, Any]]:
+        """Timestamp and engagement counts of every record in a collection that has any"""
+        # Each document is read once, however many records there are
+        likes = self.likes if 'likes' in kinds else LikeStore()
+        comments = self.comments if 'comments' in kinds else CommentStore()
+        return record_engagement(self.get_json_data(key, []), likes, comments, kinds)
+    
+    def get_all_data(self) -> Dict[str, Any]:
+        """Get every collection plus file metadata"""
+        all_data = {key: self.get_json_data(key, []) for key in COLLECTIONS}
+        for key in ('likes', 'comments', 'files'):
+            all_data[key] = self.get_data(key, {})
+        return all_data
+    
+    def store_file(self, file_content: bytes, filename: str, content_type: Optional[str] = None) -> bool:
+        """Store an uploaded file as a blob"""
+        return self.put_file(file_content, filename, content_type) is not None
+    
+    def get_file(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Get file metadata (content type, size, timestamp)"""
+        try:
+            blob_name = f"uploads/{filename}"
+            # Upload names are unique and never rewritten, so metadata
+            # stays valid until the file is deleted
+            entry = self.cache.get(blob_name)
+            if entry is not None and entry.meta is not None:
+                return dict(entry.meta)
+            blob_url = self._blob_url(blob_name)
+            if blob_url is None:
+                return None
+            metadata = self.client.head(blob_url)
+            meta = {
+                'content_type': metadata.get('contentType') or mimetypes.guess_type(filename)[0]
+                                or 'application/octet-stream',
+                'size': metadata.get('size'),
+                'timestamp': metadata.get('uploadedAt'),
+                'url': blob_url,
+            }
+            self.cache.set_meta(blob_name, blob_url, meta)
+            return dict(meta)
+        except Exception as e:
+            logging.error(f"Error getting file metadata {filename}: {e}")
+            return None
+    
+    def get_file_content(self, filename: str) -> Optional[bytes]:
+        """Download file content as bytes"""
+        try:
+            file_url = self.get_file_url(filename)
+            if not file_url:
+                return None
+            response = self.session.get(file_url, timeout=BLOB_HTTP_TIMEOUT)
+            if response.status_code == 404:
+                self.cache.invalidate(f"uploads/{filename}")
+                return None
+            response.raise_for_status()
+            return response.content
+        except Exception as e:
+            logging.error(f"Error reading file {filename}: {e}")
+            return None
+    
+    def list_files(self) -> List[str]:
+        """List all uploaded filenames"""
+        try:
+            return [blob['pathname'][len('uploads/'):] for blob in self._iter_blobs('uploads/')]
+        except Exception as e:
+            logging.error(f"Error listing files: {e}")
+            return []
+    
+    def _iter_blobs(self, prefix: str):
+        """Yield every blob under a prefix, following listing cursors"""
+        options = {'prefix': prefix, 'limit': '1000'}
+        while True:
+            blobs_response = self.client.list(options)
+            yield from blobs_response.get('blobs', [])
+            if not blobs_response.get('hasMore') or not blobs_response.get('cursor'):
+                return
+            options = {**options, 'cursor': blobs_response['cursor']}
+    
+    def stats(self) -> Dict[str, Any]:
+        """Backend details for monitoring"""
+        return {'backend': 'vercel_blob', 'token_configured': bool(self.token),
+                'cache': self.cache.stats()}
+    
+    def force_backup(self):
+        """Blob storage is the durable copy; there is nothing to send"""
+        logging.warning("Remote backups are not used with Vercel blob storage")
+    
+    def migrate_local_data(self, local_data_folder: str = "data", local_upload_folder: str = "uploads",
+                           workers: int = MIGRATION_WORKERS, manifest_path: str = MIGRATION_MANIFEST) -> bool:
         """
         Migrate existing local data to blob storage
         
+        Uploads run on a bounded worker pool and each finished blob is
+        checkpointed, so rerunning after a failure skips what already made it.
+        Progress and throughput are logged and kept in last_migration_stats.
+        
         Args:
             local_data_folder: Path to local data folder
             local_upload_folder: Path to local uploads folder
+            workers: Uploads in flight at once
+            manifest_path: Checkpoint manifest of finished uploads
             
         Returns:
             bool: Migration success status
         """
-        migration_success = True
-        
         try:
-            # Migrate JSON data files
-            data_files = ['posts.json', 'comments.json', 'likes.json', 'hall_of_fame.json', 'hall_of_shame.json']
-            
-            for data_file in data_files:
-                local_path = os.path.join(local_data_folder, data_file)
-                if os.path.exists(local_path):
-                    try:
-                        with open(local_path, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                        
-                        file_key = data_file.replace('.json', '')
-                        if not self.put_json_data(file_key, data):
-                            migration_success = False
-                            logging.error(f"Failed to migrate {data_file}")
-                        else:
-                            logging.info(f"Successfully migrated {data_file}")
-                    except Exception as e:
-                        logging.error(f"Error migrating {data_file}: {e}")
-                        migration_success = False
-            
-            # Migrate uploaded files
-            if os.path.exists(local_upload_folder):
-                for filename in os.listdir(local_upload_folder):
-                    file_path = os.path.join(local_upload_folder, filename)
-                    if os.path.isfile(file_path):
-                        try:
-                            with open(file_path, 'rb') as f:
-                                file_content = f.read()
-                            
-                            blob_url = self.put_file(file_content, filename)
-                            if not blob_url:
-                                migration_success = False
-                                logging.error(f"Failed to migrate file {filename}")
-                            else:
-                                logging.info(f"Successfully migrated file {filename}")
-                        except Exception as e:
-                            logging.error(f"Error migrating file {filename}: {e}")
-                            migration_success = False
-            
-            return migration_success
-            
+            migration = BlobMigration(self, manifest_path, workers=workers)
+            success = migration.run(local_data_folder, local_upload_folder)
+            self.last_migration_stats = migration.stats
+            return success
         except Exception as e:
             logging.error(f"Error during migration: {e}")
             return False
 
 
-# Global storage service instance
-storage_service = VercelBlobStorage()
\ No newline at end of file
+_default_storage: Optional[VercelBlobStorage] = None
+
+
+def __getattr__(name: str) -> Any:
+    """Build the old module-level ``storage_service`` instance on first use"""
+    # Kept for existing imports; new code should call storage_backend.create_storage()
+    global _default_storage
+    if name == 'storage_service':
+        if _default_storage is None:
+            _default_storage = VercelBlobStorage()
+        return _default_storage
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
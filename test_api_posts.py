@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the cursor-paginated /api/posts endpoint
+
+Run with: python -m unittest test_api_posts
+"""
+
+import os
+import re
+import unittest
+from unittest import mock
+
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+
+from app import app  # noqa: E402
+from memory_storage import MemoryStorage  # noqa: E402
+
+
+class ApiPostsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # A private store keeps these posts out of other modules' app tests
+        with mock.patch.dict(os.environ, {'BACKUP_URL': '', 'SNAPSHOT_PATH': ''}):
+            storage = MemoryStorage()
+        patcher = mock.patch('app.storage', storage)
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+        for i in range(5):
+            storage.insert_ordered('posts', {'id': f'api{i}', 'username': 'tester', 'content': f'post {i}',
+                                             'timestamp': f'2024-01-0{i + 1}T00:00:00'})
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def next_url(self, response):
+        match = re.match(r'<([^>]+)>; rel="next"', response.headers.get('Link', ''))
+        return match.group(1) if match else None
+
+    def test_cursor_walks_pages_newest_first(self):
+        response = self.client.get('/api/posts?limit=2&fields=id')
+        self.assertEqual(response.get_json(), [{'id': 'api4'}, {'id': 'api3'}])
+        response = self.client.get(self.next_url(response))
+        self.assertEqual(response.get_json(), [{'id': 'api2'}, {'id': 'api1'}])
+        self.assertIsNotNone(self.next_url(response))
+
+    def test_internal_seq_is_hidden_unless_selected(self):
+        post = self.client.get('/api/posts?limit=1').get_json()[0]
+        self.assertEqual(post['id'], 'api4')
+        self.assertNotIn('seq', post)
+        self.assertIn('seq', self.client.get('/api/posts?limit=1&fields=id,seq').get_json()[0])
+
+    def test_invalid_parameters_are_rejected(self):
+        self.assertEqual(self.client.get('/api/posts?cursor=not-a-cursor').status_code, 400)
+        self.assertEqual(self.client.get('/api/posts?limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/posts?limit=1000').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
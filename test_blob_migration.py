@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for resumable local-to-blob migration, run against LocalBlobService
+
+Run with: python -m unittest test_blob_migration
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from storage_service import VercelBlobStorage
+from test_storage_backends import LocalBlobService
+
+
+class FlakyBlobService(LocalBlobService):
+    """Blob stand-in whose uploads of chosen pathnames fail"""
+
+    def __init__(self, failing=()):
+        super().__init__()
+        self.failing = set(failing)
+        self.puts = []
+
+    def put(self, pathname, body, options=None, verbose=False):
+        self.puts.append(pathname)
+        if pathname in self.failing:
+            raise ConnectionError(f'upload of {pathname} failed')
+        return super().put(pathname, body, options, verbose)
+
+
+class BlobMigrationTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.data_folder = os.path.join(directory.name, 'data')
+        self.upload_folder = os.path.join(directory.name, 'uploads')
+        self.manifest = os.path.join(directory.name, 'manifest.json')
+        os.makedirs(self.data_folder)
+        os.makedirs(self.upload_folder)
+        with open(os.path.join(self.data_folder, 'posts.json'), 'w') as f:
+            json.dump([{'id': 'p1', 'content': 'skibidi'}], f)
+        self.uploads = {f'file{i}.png': bytes([i]) * (1000 + i) for i in range(20)}
+        self.uploads['empty.txt'] = b''
+        for name, content in self.uploads.items():
+            with open(os.path.join(self.upload_folder, name), 'wb') as f:
+                f.write(content)
+
+    def migrate(self, service):
+        storage = VercelBlobStorage(client=service)
+        success = storage.migrate_local_data(self.data_folder, self.upload_folder,
+                                             workers=4, manifest_path=self.manifest)
+        return success, storage.last_migration_stats
+
+    def start_service(self, failing=()):
+        service = FlakyBlobService(failing)
+        self.addCleanup(service.close)
+        return service
+
+    def test_migrates_data_and_uploads(self):
+        service = self.start_service()
+        success, stats = self.migrate(service)
+        self.assertTrue(success)
+        self.assertEqual(stats['files_done'], len(self.uploads) + 1)
+        self.assertEqual(stats['bytes_done'], stats['bytes_total'])
+        for name, content in self.uploads.items():
+            self.assertEqual(service.blobs[f'uploads/{name}'][0], content)
+        self.assertEqual(json.loads(service.blobs['data/posts.json'][0])[0]['id'], 'p1')
+
+    def test_rerun_resumes_after_failures(self):
+        first = self.start_service(failing={'uploads/file3.png', 'uploads/file7.png'})
+        success, stats = self.migrate(first)
+        self.assertFalse(success)
+        self.assertEqual(stats['files_failed'], 2)
+
+        second = self.start_service()
+        second.blobs.update(first.blobs)
+        success, stats = self.migrate(second)
+        self.assertTrue(success)
+        self.assertEqual(sorted(second.puts), ['uploads/file3.png', 'uploads/file7.png'])
+        self.assertEqual(stats['files_skipped'], len(self.uploads) - 1)
+
+    def test_changed_file_is_uploaded_again(self):
+        self.migrate(self.start_service())
+        with open(os.path.join(self.upload_folder, 'file1.png'), 'wb') as f:
+            f.write(b'changed')
+        service = self.start_service()
+        success, _ = self.migrate(service)
+        self.assertTrue(success)
+        self.assertEqual(service.puts, ['uploads/file1.png'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for ETag/Last-Modified validation of the read routes
+
+Run with: python -m unittest test_conditional_requests
+"""
+
+import os
+import unittest
+
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+
+from app import app, create_post, add_comment  # noqa: E402
+from http_validators import ValidatorClock  # noqa: E402
+
+
+class ValidatorClockTest(unittest.TestCase):
+    def test_same_etag_keeps_its_time(self):
+        clock = ValidatorClock()
+        first = clock.last_modified('/', 'a')
+        self.assertEqual(clock.last_modified('/', 'a'), first)
+
+    def test_new_versions_get_later_seconds(self):
+        clock = ValidatorClock()
+        times = [clock.last_modified('/', etag) for etag in 'abcd']
+        self.assertEqual(times, sorted(set(times)))
+
+    def test_forgotten_resource_still_moves_forward(self):
+        clock = ValidatorClock(max_entries=1)
+        first = clock.last_modified('/', 'a')
+        clock.last_modified('/other', 'x')
+        self.assertGreater(clock.last_modified('/', 'b'), first)
+
+
+class ConditionalRequestTest(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.post = create_post('tester', 'conditional requests')
+
+    def assert_revalidates(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        etag, last_modified = response.headers['ETag'], response.headers['Last-Modified']
+        self.assertTrue(etag.startswith('W/'))
+        not_modified = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.data, b'')
+        self.assertEqual(self.client.get(url, headers={'If-Modified-Since': last_modified}).status_code, 304)
+        return etag, last_modified
+
+    def test_read_routes_answer_304(self):
+        for url in ('/', '/hall-of-fame', '/hall-of-shame', '/skibidi-scrolls',
+                    f"/comments/{self.post['id']}?page=1", '/api/posts?limit=5'):
+            with self.subTest(url=url):
+                self.assert_revalidates(url)
+
+    def test_write_invalidates_etag(self):
+        etag, _ = self.assert_revalidates('/')
+        create_post('tester', 'a newer post')
+        self.assertEqual(self.client.get('/', headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_write_in_same_second_invalidates_last_modified(self):
+        url = f"/comments/{self.post['id']}?page=1"
+        _, last_modified = self.assert_revalidates(url)
+        add_comment(self.post['id'], 'tester', 'first!')
+        response = self.client.get(url, headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['pagination']['total'], 1)
+
+    def test_pending_flash_is_not_validated(self):
+        self.client.post(f"/like/{self.post['id']}", data={})  # flashes an error
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
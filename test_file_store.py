@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory-budgeted file store: LRU spilling, promotion on read and
+content readers that outlive eviction and deletion
+
+Run with: python -m unittest test_file_store
+"""
+
+import unittest
+
+from file_store import FileStore
+
+
+class FileStoreTest(unittest.TestCase):
+    def setUp(self):
+        # Room for one 100-byte file in RAM
+        self.store = FileStore(memory_budget=150)
+        self.files = {'a.png': b'a' * 100, 'b.png': b'b' * 100, 'c.png': b'c' * 100}
+
+    def put(self, *names):
+        for name in names:
+            self.store.put(name, self.files[name], {'size': len(self.files[name])})
+
+    def test_budget_overflow_spills_oldest_files(self):
+        self.put('a.png', 'b.png', 'c.png')
+        stats = self.store.stats()
+        self.assertEqual((stats['hot_files'], stats['memory_bytes']), (1, 100))
+        self.assertEqual((stats['spilled_files'], stats['segment_bytes']), (2, 200))
+        for name, content in self.files.items():
+            self.assertEqual(self.store.get_content(name, promote=False), content)
+        # Reads without promotion leave RAM untouched: c.png was newest
+        self.assertEqual(self.store.stats()['hot_files'], 1)
+        self.assertEqual(self.store.snapshot()['c.png'][1](), self.files['c.png'])
+
+    def test_unlimited_budget_never_spills(self):
+        store = FileStore(memory_budget=None)
+        for name, content in self.files.items():
+            store.put(name, content, {})
+        self.assertEqual(store.stats()['spilled_files'], 0)
+        self.assertEqual(store.stats()['segment_bytes'], 0)
+
+    def test_reading_spilled_file_promotes_without_reappending(self):
+        self.put('a.png', 'b.png')
+        self.assertEqual(self.store.stats()['segment_bytes'], 100)
+
+        # a.png comes back into RAM and pushes b.png out
+        self.assertEqual(self.store.get_content('a.png'), self.files['a.png'])
+        self.assertEqual(self.store.stats()['segment_bytes'], 200)
+
+        # Both are already in the segment, so evicting them again is free
+        for name in ('b.png', 'a.png', 'b.png'):
+            self.assertEqual(self.store.get_content(name), self.files[name])
+        stats = self.store.stats()
+        self.assertEqual((stats['hot_files'], stats['segment_bytes']), (1, 200))
+
+    def test_readers_outlive_eviction_and_delete(self):
+        self.put('a.png', 'b.png')
+        refs = self.store.snapshot()  # a.png spilled, b.png hot
+        self.put('c.png')  # evicts b.png
+        for name in ('a.png', 'b.png', 'c.png'):
+            self.assertTrue(self.store.delete(name))
+        self.assertFalse(self.store.delete('a.png'))
+        self.assertIsNone(self.store.get_content('a.png'))
+        for name, (meta, reader) in refs.items():
+            self.assertEqual(meta['size'], 100)
+            self.assertEqual(reader(), self.files[name])
+
+    def test_replacing_a_file_releases_its_memory(self):
+        self.put('a.png')
+        self.store.put('a.png', b'x' * 10, {'size': 10})
+        self.assertEqual(self.store.stats()['memory_bytes'], 10)
+        self.assertEqual(self.store.get_content('a.png'), b'x' * 10)
+        self.assertEqual(len(self.store), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for incrementally maintained leaderboards
+
+Run with: python -m unittest test_leaderboard
+"""
+
+import random
+import unittest
+
+from leaderboard import Leaderboard, RankingSync, TrendingBoard, parse_weights
+
+
+class LeaderboardTest(unittest.TestCase):
+    def setUp(self):
+        self.board = Leaderboard(3, {'likes': 3, 'comments': 2, 'views': 0.5})
+
+    def test_parse_weights(self):
+        self.assertEqual(parse_weights('likes=3, comments=-1,'), {'likes': 3.0, 'comments': -1.0})
+
+    def test_keeps_best_k_in_order(self):
+        for i in range(6):
+            self.board.update(f'p{i}', {'likes': i})
+        self.assertEqual(self.board.top(), [('p5', 15), ('p4', 12), ('p3', 9)])
+
+    def test_dropped_member_is_replaced_by_best_waiting(self):
+        for i in range(1, 6):
+            self.board.update(f'p{i}', {'likes': i})
+        self.board.update('p5', {'likes': 0})
+        self.assertEqual([record_id for record_id, _ in self.board.top()], ['p4', 'p3', 'p2'])
+        self.board.remove('p4')
+        self.assertEqual([record_id for record_id, _ in self.board.top()], ['p3', 'p2', 'p1'])
+
+    def test_non_positive_scores_are_not_ranked(self):
+        board = Leaderboard(3, {'comments': 1, 'likes': -2})
+        board.update('ratioed', {'comments': 5, 'likes': 1})
+        board.update('loved', {'comments': 1, 'likes': 4})
+        self.assertEqual(board.top(), [('ratioed', 3)])
+
+    def test_matches_full_sort_under_random_updates(self):
+        rng = random.Random(7)
+        counts = {}
+        for step in range(3000):
+            record_id = f'p{rng.randrange(40)}'
+            counts[record_id] = {'likes': rng.randrange(10), 'comments': rng.randrange(5)}
+            self.board.update(record_id, counts[record_id])
+            if step % 100 == 0:
+                scores = sorted((self.board.score(c) for c in counts.values() if self.board.score(c)),
+                                reverse=True)
+                self.assertEqual([score for _, score in self.board.top()], scores[:3])
+
+    def test_rebuild(self):
+        self.board.update('old', {'likes': 9})
+        self.board.rebuild([('a', {'likes': 1}), ('b', {'views': 10}), ('c', {})])
+        self.assertEqual(self.board.top(), [('b', 5), ('a', 3)])
+
+
+class TrendingBoardTest(unittest.TestCase):
+    def test_engagement_decays_with_age(self):
+        day = 24 * 60 * 60
+        board = TrendingBoard(3, {'likes': 1}, half_life=day)
+        now = 1_700_000_000
+        board.update('old_hit', {'likes': 30, 'created': now - 5 * day})
+        board.update('fresh', {'likes': 2, 'created': now})
+        board.update('yesterday', {'likes': 3, 'created': now - day})
+        board.update('unseen', {'likes': 0, 'created': now})
+        # 30 / 32 < 3 / 2 < 2
+        self.assertEqual([record_id for record_id, _ in board.top()], ['fresh', 'yesterday', 'old_hit'])
+        board.update('yesterday', {'likes': 5, 'created': now - day})
+        self.assertEqual(board.top()[0][0], 'yesterday')
+
+
+class RankingSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.generations = {'likes': 0, 'comments': 0}
+        self.rebuilds = 0
+        self.sync = RankingSync(('likes', 'comments'), self.generations.__getitem__, self.rebuild)
+
+    def rebuild(self):
+        self.rebuilds += 1
+
+    def write(self, key='likes'):
+        self.generations[key] += 1
+
+    def test_local_writes_do_not_rebuild(self):
+        self.sync.ensure()
+        with self.sync.local_write() as writes:
+            self.write()
+            writes['likes'] += 1
+        with self.sync.local_write() as writes:
+            self.write('comments')
+            self.write('comments')
+            writes['comments'] += 2
+        self.sync.ensure()
+        self.assertEqual(self.rebuilds, 1)
+
+    def test_other_workers_writes_rebuild(self):
+        self.sync.ensure()
+        self.write()  # another worker
+        with self.sync.local_write() as writes:
+            self.write()
+            writes['likes'] += 1
+        self.sync.ensure()
+        self.assertEqual(self.rebuilds, 2)
+
+    def test_other_workers_write_during_local_write_rebuilds(self):
+        self.sync.ensure()
+        with self.sync.local_write() as writes:
+            self.write()  # another worker, after the generations were read
+            self.write()
+            writes['likes'] += 1
+        self.sync.ensure()
+        self.assertEqual(self.rebuilds, 2)
+
+    def test_uncounted_write_leaves_rebuild_pending(self):
+        self.sync.ensure()
+        with self.sync.local_write():
+            self.write()
+        self.sync.ensure()
+        self.assertEqual(self.rebuilds, 2)
+
+    def test_failed_local_write_leaves_rebuild_pending(self):
+        self.sync.ensure()
+        with self.assertRaises(RuntimeError):
+            with self.sync.local_write():
+                self.write()
+                raise RuntimeError('write failed part-way')
+        self.sync.ensure()
+        self.assertEqual(self.rebuilds, 2)
+
+    def test_digest_generations_rebuild_after_local_writes(self):
+        self.generations.update(likes='digest-1', comments='digest-2')
+        self.sync.ensure()
+        with self.sync.local_write() as writes:
+            self.generations['likes'] = 'digest-3'
+            writes['likes'] += 1
+        self.sync.ensure()
+        self.assertEqual(self.rebuilds, 2)
+
+    def test_counter_is_shared_between_trackers(self):
+        other = RankingSync(('likes',), self.generations.__getitem__, self.rebuild)
+        self.sync.ensure()
+        other.ensure()
+        with self.sync.local_write() as writes, other.local_write(writes):
+            self.write()
+            writes['likes'] += 1
+        self.sync.ensure()
+        other.ensure()
+        self.assertEqual(self.rebuilds, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for memory storage backups: full checkpoints, deltas, acknowledgement,
+the streamed gzip body, blob deduplication and blob queries after a restart
+
+Run with: python -m unittest test_memory_backups
+"""
+
+import gzip
+import json
+import os
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from memory_storage import BACKUP_CHUNK_SIZE, MemoryStorage
+
+
+class BackupServer:
+    """Stand-in for requests.post that records each decoded backup"""
+
+    def __init__(self):
+        self.backups = []
+        self.headers = []
+        self.chunks = []
+        self.blobs = set()
+        self.status_code = 200
+
+    def post(self, url, data=None, headers=None, **kwargs):
+        if 'json' in kwargs:
+            # Blob query: which of these hashes are already stored
+            held = [sha256 for sha256 in kwargs['json']['have'] if sha256 in self.blobs]
+            return SimpleNamespace(status_code=200, text='', json=lambda: {'blobs': held})
+        chunks = list(data)  # a generator: the body is streamed, not prebuilt
+        self.chunks.append(len(chunks))
+        body = b''.join(chunks)
+        self.headers.append(headers)
+        backup = json.loads(gzip.decompress(body))
+        self.backups.append(backup)
+        if self.status_code == 200:
+            self.blobs.update(backup['blobs'])
+        return SimpleNamespace(status_code=self.status_code, text='', json=lambda: {'message': 'OK'})
+
+
+class MemoryBackupTest(unittest.TestCase):
+    def setUp(self):
+        self.storage = self.make_storage()
+        self.server = BackupServer()
+        patcher = mock.patch('memory_storage.requests.post', self.server.post)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_storage(self):
+        env = {'BACKUP_URL': 'http://backup.invalid', 'BACKUP_INTERVAL': '3600',
+               'BACKUP_CHECKPOINT_EVERY': '3', 'SNAPSHOT_PATH': ''}
+        with mock.patch.dict(os.environ, env):
+            return MemoryStorage()
+
+    def add_post(self, post_id):
+        self.storage.insert_ordered('posts', {'id': post_id, 'username': 'alice', 'content': post_id,
+                                              'timestamp': f'2024-01-01T00:00:{len(self.server.backups):02d}'})
+
+    def backup(self):
+        """Force a backup, returning what the server received (None if nothing was sent)"""
+        sent = len(self.server.backups)
+        self.storage.force_backup()
+        return self.server.backups[sent] if len(self.server.backups) > sent else None
+
+    def test_first_backup_is_full_then_deltas(self):
+        self.add_post('p1')
+        full = self.backup()
+        self.assertEqual(full['type'], 'full')
+        self.assertEqual([p['id'] for p in full['data']['posts']], ['p1'])
+
+        self.add_post('p2')
+        self.storage.toggle_like('p2', 'bob')
+        delta = self.backup()
+        self.assertEqual(delta['type'], 'delta')
+        self.assertEqual(delta['since_seq'], full['seq'])
+        self.assertEqual([change['op'] for change in delta['data']['changes']], ['append', 'like'])
+
+    def test_nothing_sent_without_changes(self):
+        self.add_post('p1')
+        self.backup()
+        self.assertIsNone(self.backup())
+
+    def test_unacknowledged_changes_are_resent(self):
+        self.add_post('p1')
+        self.backup()
+        self.add_post('p2')
+        self.server.status_code = 500
+        failed = self.backup()
+        self.server.status_code = 200
+        self.add_post('p3')
+        retried = self.backup()
+        self.assertEqual(retried['since_seq'], failed['since_seq'])
+        self.assertEqual([c['item']['id'] for c in retried['data']['changes']], ['p2', 'p3'])
+
+    def test_set_data_forces_full_backup(self):
+        self.add_post('p1')
+        self.backup()
+        self.storage.set_data('hall_of_fame', [{'id': 'p1'}])
+        self.assertEqual(self.backup()['type'], 'full')
+
+    def test_periodic_checkpoint(self):
+        self.add_post('p0')
+        self.backup()
+        types = []
+        for i in range(4):
+            self.add_post(f'p{i + 1}')
+            types.append(self.backup()['type'])
+        self.assertEqual(types, ['delta', 'delta', 'delta', 'full'])
+
+    def test_body_is_gzipped_and_streamed_in_chunks(self):
+        self.add_post('p1')
+        for i in range(3):
+            self.storage.store_file(os.urandom(BACKUP_CHUNK_SIZE), f'noise{i}.bin')
+        backup = self.backup()
+        self.assertEqual(self.server.headers[-1]['Content-Encoding'], 'gzip')
+        self.assertGreater(self.server.chunks[-1], 1)
+        self.assertEqual(len(backup['blobs']), 3)
+
+    def test_blobs_are_deduplicated_and_sent_once(self):
+        self.storage.store_file(b'same bytes', 'a.png')
+        self.storage.store_file(b'same bytes', 'b.png')
+        full = self.backup()
+        self.assertEqual(len(full['blobs']), 1)
+        self.assertEqual(full['data']['files']['a.png']['sha256'], full['data']['files']['b.png']['sha256'])
+
+        # Content the server acknowledged is referenced by hash only
+        self.storage.store_file(b'same bytes', 'c.png')
+        self.storage.store_file(b'new bytes', 'd.png')
+        delta = self.backup()
+        self.assertEqual(len(delta['blobs']), 1)
+        files = {c['filename']: c['file'] for c in delta['data']['changes']}
+        self.assertIn(files['d.png']['sha256'], delta['blobs'])
+        self.assertNotIn(files['c.png']['sha256'], delta['blobs'])
+
+    def test_unacknowledged_blobs_are_resent(self):
+        self.storage.store_file(b'first', 'a.png')
+        self.server.status_code = 500
+        self.backup()
+        self.server.status_code = 200
+        self.assertEqual(len(self.backup()['blobs']), 1)
+
+
+    def test_restarted_storage_skips_blobs_the_server_holds(self):
+        self.storage.store_file(b'kept', 'a.png')
+        self.backup()
+        # A new process has no record of what was acknowledged before
+        self.storage = self.make_storage()
+        self.storage.store_file(b'kept', 'a.png')
+        self.storage.store_file(b'new', 'b.png')
+        full = self.backup()
+        self.assertEqual(full['type'], 'full')
+        self.assertEqual(list(full['blobs']), [full['data']['files']['b.png']['sha256']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for keeping the halls and trending in sync with storage: a worker's own
+writes are applied incrementally, other workers' writes trigger a rebuild
+
+Run with: python -m unittest test_rankings
+"""
+
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+
+import app  # noqa: E402
+from memory_storage import MemoryStorage  # noqa: E402
+
+
+class RankingSyncAppTest(unittest.TestCase):
+    def setUp(self):
+        with mock.patch.dict(os.environ, {'BACKUP_URL': '', 'SNAPSHOT_PATH': ''}):
+            self.storage = MemoryStorage()
+        for patcher in (mock.patch('app.storage', self.storage),
+                        mock.patch.object(app.hall_sync, 'synced', None),
+                        mock.patch.object(app.trending_sync, 'synced', None)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        app.hall_sync.ensure()
+        app.trending_sync.ensure()
+
+    def rebuilds(self, sync):
+        """Count rebuilds of one tracker for the rest of the test"""
+        patcher = mock.patch.object(sync, '_rebuild', wraps=sync._rebuild)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_local_writes_keep_rankings_synced(self):
+        hall_rebuilds, trending_rebuilds = self.rebuilds(app.hall_sync), self.rebuilds(app.trending_sync)
+        post = app.create_post('alice', 'skibidi')
+        app.toggle_like(post['id'], 'bob')
+        app.add_comment(post['id'], 'carol', 'ohio')
+        video = app.create_video('alice', 'rizz', '', 'rizz.mp4')
+        app.toggle_video_like(video['id'], 'bob')
+        app.view_counter.add(video['id'])
+        app.view_counter.flush()
+
+        self.assertEqual([p['id'] for p in app.load_hall_of_fame()], [post['id']])
+        self.assertEqual([v['id'] for v in app.load_trending_videos()], [video['id']])
+        hall_rebuilds.assert_not_called()
+        trending_rebuilds.assert_not_called()
+
+    def test_other_workers_writes_rebuild(self):
+        post = app.create_post('alice', 'skibidi')
+        video = app.create_video('alice', 'rizz', '', 'rizz.mp4')
+        hall_rebuilds, trending_rebuilds = self.rebuilds(app.hall_sync), self.rebuilds(app.trending_sync)
+        # Written straight to storage, as another worker would
+        self.storage.toggle_like(post['id'], 'bob')
+        self.storage.toggle_like(video['id'], 'bob')
+
+        self.assertEqual([p['id'] for p in app.load_hall_of_fame()], [post['id']])
+        self.assertEqual([v['id'] for v in app.load_trending_videos()], [video['id']])
+        self.assertEqual((hall_rebuilds.call_count, trending_rebuilds.call_count), (1, 1))
+
+    def test_rebuild_keeps_videos_with_only_unflushed_views(self):
+        video = app.create_video('alice', 'rizz', '', 'rizz.mp4')
+        self.client_view(video['id'])
+        self.storage.toggle_like('another-post', 'bob')  # another worker: trending rebuilds
+        self.assertEqual([v['id'] for v in app.load_trending_videos()], [video['id']])
+
+    def client_view(self, video_id):
+        """Send a view beacon; its count stays pending until the end of the test"""
+        self.addCleanup(app.view_counter.flush)
+        response = app.app.test_client().post(f'/track-view/{video_id}')
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
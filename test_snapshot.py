@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for local snapshots: memory storage round trip with lazily loaded blobs
+
+Run with: python -m unittest test_snapshot
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from memory_storage import MemoryStorage
+from snapshot import read_snapshot_index
+
+
+class SnapshotRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'snapshot.bin')
+        # About two 1000-byte files fit in RAM, so the rest spill to disk
+        self.env = {'SNAPSHOT_PATH': self.path, 'SNAPSHOT_INTERVAL': '3600',
+                    'FILE_MEMORY_BUDGET_MB': str(2500 / 1024 / 1024), 'BACKUP_URL': ''}
+        self.files = {'a.png': b'a' * 1000, 'b.png': b'b' * 1000,
+                      'c.png': b'c' * 1000, 'copy-of-a.png': b'a' * 1000}
+
+    def make_storage(self):
+        with mock.patch.dict(os.environ, self.env):
+            storage = MemoryStorage()
+        # Don't write snapshots of a deleted directory at interpreter exit
+        self.addCleanup(setattr, storage, 'snapshot_path', None)
+        return storage
+
+    def populate(self, storage):
+        storage.insert_ordered('posts', {'id': 'p1', 'username': 'alice', 'content': 'skibidi',
+                                         'timestamp': '2024-01-01T00:00:00'})
+        storage.toggle_like('p1', 'bob')
+        storage.add_comment('p1', {'id': 'c1', 'username': 'bob', 'content': 'ohio',
+                                   'timestamp': '2024-01-01T00:01:00'})
+        for name, content in self.files.items():
+            storage.store_file(content, name, 'image/png')
+
+    def test_round_trip_restores_collections_and_files(self):
+        original = self.make_storage()
+        self.populate(original)
+        self.assertGreater(original.files.stats()['spilled_files'], 0)
+        self.assertTrue(original.save_snapshot())
+
+        restored = self.make_storage()
+        self.assertEqual(restored.get_ordered('posts')[0]['content'], 'skibidi')
+        self.assertEqual(restored.likes.count('p1'), 1)
+        self.assertEqual(restored.comments.count('p1'), 1)
+        self.assertEqual(restored.search('posts', 'skib')[0]['id'], 'p1')
+        self.assertEqual(sorted(restored.list_files()), sorted(self.files))
+        for name, content in self.files.items():
+            self.assertEqual(restored.get_file(name)['size'], len(content))
+            self.assertEqual(restored.get_file_content(name), content)
+
+    def test_file_content_is_loaded_lazily(self):
+        original = self.make_storage()
+        self.populate(original)
+        original.save_snapshot()
+
+        restored = self.make_storage()
+        stats = restored.files.stats()
+        self.assertEqual((stats['hot_files'], stats['memory_bytes']), (0, 0))
+        self.assertEqual(stats['spilled_files'], len(self.files))
+        restored.get_file_content('c.png')
+        self.assertEqual(restored.files.stats()['hot_files'], 1)
+
+    def test_identical_content_is_stored_once(self):
+        original = self.make_storage()
+        self.populate(original)
+        original.save_snapshot()
+        _, manifest, blob_start = read_snapshot_index(self.path)
+        self.assertEqual(manifest['a.png']['offset'], manifest['copy-of-a.png']['offset'])
+        self.assertEqual(os.path.getsize(self.path) - blob_start, 3 * 1000)
+
+    def test_unchanged_storage_skips_snapshot(self):
+        storage = self.make_storage()
+        self.populate(storage)
+        self.assertTrue(storage.save_snapshot())
+        self.assertFalse(storage.save_snapshot())
+        storage.toggle_like('p1', 'carol')
+        self.assertTrue(storage.save_snapshot())
+
+    def test_corrupt_snapshot_is_not_restored(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a snapshot')
+        storage = self.make_storage()
+        self.assertEqual(len(storage.get_ordered('posts')), 0)
+        self.assertFalse(storage.restore_snapshot(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
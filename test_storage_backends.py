@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Conformance tests for the storage backends
+
+Every backend selectable with STORAGE_BACKEND runs the same checks through
+the StorageBackend interface. Vercel Blob is replaced by LocalBlobService, an
+in-process stand-in that serves blob URLs from a local HTTP server.
+
+Run with: python -m unittest test_storage_backends
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from memory_storage import MemoryStorage
+from sqlite_storage import SQLiteStorage
+from storage_backend import StorageBackend
+from storage_service import VercelBlobStorage
+
+
+class LocalBlobService:
+    """Stand-in for the vercel_blob API (put/list/head/delete) backed by a dict"""
+
+    def __init__(self):
+        self.blobs = {}  # pathname -> (content, uploadedAt)
+        self.downloads = []  # (pathname, status) per GET, to check caching
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                pathname = self.path.lstrip('/')
+                blob = service.blobs.get(pathname)
+                if blob is None:
+                    service.downloads.append((pathname, 404))
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                etag = '"%s"' % hashlib.sha256(blob[0]).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    service.downloads.append((pathname, 304))
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                service.downloads.append((pathname, 200))
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(blob[0])))
+                self.end_headers()
+                self.wfile.write(blob[0])
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _info(self, pathname):
+        content, uploaded_at = self.blobs[pathname]
+        url = self.base_url + pathname
+        return {'url': url, 'downloadUrl': url, 'pathname': pathname,
+                'size': len(content), 'uploadedAt': uploaded_at}
+
+    def put(self, pathname, body, options=None, verbose=False):
+        if pathname in self.blobs and not (options or {}).get('allowOverwrite'):
+            raise ValueError(f'{pathname} already exists')
+        self.blobs[pathname] = (bytes(body), datetime.now(timezone.utc).isoformat())
+        return {**self._info(pathname), 'contentType': mimetypes.guess_type(pathname)[0]}
+
+    def list(self, options=None):
+        options = options or {}
+        names = sorted(name for name in self.blobs if name.startswith(options.get('prefix', '')))
+        start = int(options.get('cursor') or 0)
+        end = start + int(options.get('limit', 1000))
+        response = {'blobs': [self._info(name) for name in names[start:end]],
+                    'hasMore': end < len(names)}
+        if response['hasMore']:
+            response['cursor'] = str(end)
+        return response
+
+    def head(self, url):
+        pathname = url[len(self.base_url):]
+        return {**self._info(pathname),
+                'contentType': mimetypes.guess_type(pathname)[0] or 'application/octet-stream'}
+
+    def delete(self, urls):
+        for url in urls:
+            self.blobs.pop(url[len(self.base_url):], None)
+
+
+class StorageBackendConformance:
+    """Checks every StorageBackend must pass; mixed into one TestCase per backend"""
+
+    def make_storage(self) -> StorageBackend:
+        raise NotImplementedError
+
+    def setUp(self):
+        self.storage = self.make_storage()
+
+    def test_implements_protocol(self):
+        self.assertIsInstance(self.storage, StorageBackend)
+
+    def test_set_and_get_collection(self):
+        halls = [{'id': 'a', 'content': 'first'}, {'id': 'b', 'content': 'second'}]
+        self.assertTrue(self.storage.set_data('hall_of_fame', halls))
+        self.assertEqual([p['id'] for p in self.storage.get_data('hall_of_fame')], ['a', 'b'])
+        self.assertTrue(self.storage.append_data('hall_of_fame', {'id': 'c', 'content': 'third'}))
+        self.assertEqual([p['id'] for p in self.storage.get_data('hall_of_fame')], ['a', 'b', 'c'])
+
+    def test_missing_collection_is_empty(self):
+        self.assertEqual(list(self.storage.get_data('hall_of_shame', [])), [])
+        self.assertEqual(len(self.storage.get_ordered('videos')), 0)
+
+    def test_ordered_collection_is_newest_first(self):
+        for i, timestamp in enumerate(['2024-01-02', '2024-01-03', '2024-01-01']):
+            self.assertTrue(self.storage.insert_ordered('posts', {
+                'id': f'p{i}', 'timestamp': timestamp, 'username': 'u', 'content': f'post {i}'}))
+        posts = self.storage.get_ordered('posts')
+        self.assertEqual(len(posts), 3)
+        self.assertEqual([p['id'] for p in posts], ['p1', 'p0', 'p2'])
+        self.assertEqual([p['id'] for p in posts[1:3]], ['p0', 'p2'])
+        self.assertEqual(posts[0]['id'], 'p1')
+
+    def test_ordered_page_seeks_by_position(self):
+        for i in range(5):
+            self.storage.insert_ordered('posts', {'id': f'p{i}', 'timestamp': f'2024-01-0{i + 1}'})
+        # Same timestamp as p2: seq breaks the tie
+        self.storage.insert_ordered('posts', {'id': 'p2b', 'timestamp': '2024-01-03'})
+        first = self.storage.ordered_page('posts', None, 3)
+        self.assertEqual([p['id'] for p in first], ['p4', 'p3', 'p2b'])
+        last = first[-1]
+        rest = self.storage.ordered_page('posts', (last['timestamp'], last['seq']), 10)
+        self.assertEqual([p['id'] for p in rest], ['p2', 'p1', 'p0'])
+        self.assertEqual(self.storage.ordered_page('posts', ('2024-01-01', 0), 10), [])
+
+    def test_search_matches_every_word_by_prefix(self):
+        self.storage.insert_ordered('posts', {'id': 'a', 'timestamp': '2024-01-01',
+                                              'username': 'sigma', 'content': 'Skibidi toilet rizz'})
+        self.storage.insert_ordered('posts', {'id': 'b', 'timestamp': '2024-01-02',
+                                              'username': 'ohio', 'content': 'skibidi forever'})
+        self.assertEqual([p['id'] for p in self.storage.search('posts', 'skib')], ['b', 'a'])
+        self.assertEqual([p['id'] for p in self.storage.search('posts', 'skibidi sig')], ['a'])
+        self.assertEqual(len(self.storage.search('posts', 'gyatt')), 0)
+
+    def test_get_record_by_id(self):
+        self.storage.insert_ordered('videos', {'id': 'v1', 'timestamp': '2024-01-01', 'title': 'one'})
+        self.storage.insert_ordered('videos', {'id': 'v2', 'timestamp': '2024-01-02', 'title': 'two'})
+        self.assertEqual(self.storage.get_record('videos', 'v1')['title'], 'one')
+        self.assertIsNone(self.storage.get_record('videos', 'v3'))
+        self.assertIsNone(self.storage.get_record('posts', 'v1'))
+        self.storage.set_data('videos', [{'id': 'v3', 'timestamp': '2024-01-03'}])
+        self.assertIsNone(self.storage.get_record('videos', 'v1'))
+        self.assertIsNotNone(self.storage.get_record('videos', 'v3'))
+
+    def test_increment_updates_stored_record(self):
+        video = {'id': 'v1', 'timestamp': '2024-01-01', 'views': 0}
+        self.storage.insert_ordered('videos', video)
+        self.assertEqual(self.storage.increment('videos', video, 'views'), 1)
+        self.assertEqual(self.storage.increment('videos', video, 'views', 2), 3)
+        self.assertEqual(self.storage.get_ordered('videos')[0]['views'], 3)
+
+    def test_toggle_like(self):
+        self.assertEqual(self.storage.toggle_like('p1', 'alice'), ('liked', 1))
+        self.assertEqual(self.storage.toggle_like('p1', 'bob'), ('liked', 2))
+        self.assertEqual(self.storage.toggle_like('p1', 'alice'), ('unliked', 1))
+        self.assertEqual(self.storage.likes.count('p1'), 1)
+        self.assertEqual(self.storage.likes.count('p2'), 0)
+        self.assertEqual(self.storage.get_data('likes'), {'p1': ['bob']})
+
+    def test_engagement_is_read_in_bulk(self):
+        self.storage.insert_ordered('posts', {'id': 'p1', 'timestamp': '2024-01-01', 'content': 'x'})
+        self.storage.insert_ordered('posts', {'id': 'p2', 'timestamp': '2024-01-02', 'content': 'y'})
+        self.storage.insert_ordered('posts', {'id': 'p3', 'timestamp': '2024-01-03', 'content': 'z'})
+        self.storage.insert_ordered('videos', {'id': 'v1', 'timestamp': '2024-01-04', 'views': 4})
+        self.storage.toggle_like('p1', 'alice')
+        self.storage.toggle_like('p1', 'bob')
+        self.storage.toggle_like('v1', 'alice')
+        self.storage.add_comment('p2', {'id': 'c1', 'username': 'bob', 'content': 'ohio',
+                                        'timestamp': '2024-01-02'})
+        self.assertEqual(self.storage.engagement('posts'), {
+            'p1': {'timestamp': '2024-01-01', 'likes': 2, 'comments': 0, 'views': 0},
+            'p2': {'timestamp': '2024-01-02', 'likes': 0, 'comments': 1, 'views': 0},
+        })
+        self.assertEqual(self.storage.engagement('videos', ('likes', 'views')),
+                         {'v1': {'timestamp': '2024-01-04', 'likes': 1, 'views': 4}})
+        self.assertEqual(self.storage.engagement('posts', ('views',)), {})
+
+    def test_comments_are_newest_first(self):
+        for i in range(4):
+            self.assertTrue(self.storage.add_comment('p1', {'text': f'c{i}', 'timestamp': f'2024-01-0{i + 1}'}))
+        comments = self.storage.comments
+        self.assertEqual(comments.count('p1'), 4)
+        self.assertEqual(comments.count('p2'), 0)
+        self.assertEqual([c['text'] for c in comments.newest_first('p1')[:3]], ['c3', 'c2', 'c1'])
+        self.assertEqual(len(self.storage.get_data('comments')['p1']), 4)
+
+    def test_file_round_trip(self):
+        content = b'\x89PNG' + bytes(range(256)) * 4
+        self.assertTrue(self.storage.store_file(content, 'abc.png', 'image/png'))
+        meta = self.storage.get_file('abc.png')
+        self.assertEqual(meta['content_type'], 'image/png')
+        self.assertEqual(meta['size'], len(content))
+        self.assertNotIn('content', meta)
+        self.assertEqual(self.storage.get_file_content('abc.png'), content)
+        self.assertEqual(self.storage.list_files(), ['abc.png'])
+        self.assertIn('abc.png', self.storage.get_all_data()['files'])
+
+    def test_missing_and_deleted_files(self):
+        self.assertIsNone(self.storage.get_file('nope.png'))
+        self.assertIsNone(self.storage.get_file_content('nope.png'))
+        self.assertFalse(self.storage.delete_file('nope.png'))
+        self.storage.store_file(b'data', 'gone.mp4', 'video/mp4')
+        self.assertTrue(self.storage.delete_file('gone.mp4'))
+        self.assertIsNone(self.storage.get_file('gone.mp4'))
+        self.assertEqual(self.storage.list_files(), [])
+
+    def test_all_data_export(self):
+        self.storage.insert_ordered('posts', {'id': 'p', 'timestamp': '2024-01-01', 'content': 'x'})
+        self.storage.toggle_like('p', 'alice')
+        all_data = self.storage.get_all_data()
+        for key in ('posts', 'hall_of_fame', 'hall_of_shame', 'videos', 'likes', 'comments', 'files'):
+            self.assertIn(key, all_data)
+        self.assertEqual([p['id'] for p in all_data['posts']], ['p'])
+        self.assertEqual(all_data['likes'], {'p': ['alice']})
+
+    def test_generation_changes_on_write(self):
+        self.storage.insert_ordered('posts', {'id': 'p', 'timestamp': '2024-01-01', 'content': 'x'})
+        posts, likes = self.storage.generation('posts'), self.storage.generation('likes')
+        self.assertEqual(self.storage.generation('posts'), posts)
+        self.storage.toggle_like('p', 'alice')
+        self.assertEqual(self.storage.generation('posts'), posts)
+        self.assertNotEqual(self.storage.generation('likes'), likes)
+        self.storage.increment('posts', self.storage.get_record('posts', 'p'), 'views')
+        self.assertNotEqual(self.storage.generation('posts'), posts)
+
+    def test_stats(self):
+        self.assertIn('backend', self.storage.stats())
+
+
+class MemoryStorageTest(StorageBackendConformance, unittest.TestCase):
+    def make_storage(self):
+        return MemoryStorage()
+
+    def test_snapshot_is_point_in_time(self):
+        self.storage.insert_ordered('videos', {'id': 'v1', 'timestamp': '2024-01-02'})
+        snapshot = self.storage.get_all_data()
+        before = json.dumps(snapshot['videos'])
+        self.storage.increment('videos', self.storage.get_record('videos', 'v1'), 'views', 5)
+        self.storage.insert_ordered('videos', {'id': 'v0', 'timestamp': '2024-01-01'})
+        self.assertEqual(json.dumps(snapshot['videos']), before)
+        self.assertEqual(self.storage.get_record('videos', 'v1')['views'], 5)
+        self.assertEqual(len(self.storage.get_ordered('videos')), 2)
+
+    def test_concurrent_writes_leave_snapshots_unchanged(self):
+        for i in range(4):
+            self.storage.insert_ordered('videos', {'id': f'v{i}', 'timestamp': f'2024-01-0{i + 1}'})
+
+        def write(worker):
+            for i in range(200):
+                video = self.storage.get_record('videos', f'v{i % 4}')
+                self.storage.increment('videos', video, 'views')
+                self.storage.insert_ordered('videos', {'id': f'w{worker}-{i}', 'timestamp': '2024-01-01'})
+
+        snapshots = []
+        writers = [threading.Thread(target=write, args=(worker,)) for worker in range(8)]
+        for writer in writers:
+            snapshot = self.storage.get_all_data()
+            snapshots.append((snapshot, json.dumps(snapshot['videos'])))
+            writer.start()
+        while any(writer.is_alive() for writer in writers):
+            snapshot = self.storage.get_all_data()
+            snapshots.append((snapshot, json.dumps(snapshot['videos'])))
+        for writer in writers:
+            writer.join()
+
+        for snapshot, encoded in snapshots:
+            self.assertEqual(json.dumps(snapshot['videos']), encoded)
+        views = sum(self.storage.get_record('videos', f'v{i}').get('views', 0) for i in range(4))
+        self.assertEqual(views, 8 * 200)
+        self.assertEqual(len(self.storage.get_ordered('videos')), 4 + 8 * 200)
+
+
+class SQLiteStorageTest(StorageBackendConformance, unittest.TestCase):
+    def make_storage(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return SQLiteStorage(os.path.join(directory.name, 'test.db'))
+
+    def test_workers_share_one_database(self):
+        other = SQLiteStorage(self.storage.path)
+        self.storage.insert_ordered('posts', {'id': 'p', 'timestamp': '2024-01-01', 'content': 'x'})
+        other.toggle_like('p', 'alice')
+        self.assertEqual([p['id'] for p in other.get_ordered('posts')], ['p'])
+        self.assertEqual(self.storage.likes.count('p'), 1)
+
+
+class VercelBlobStorageTest(StorageBackendConformance, unittest.TestCase):
+    def make_storage(self):
+        self.service = LocalBlobService()
+        self.addCleanup(self.service.close)
+        return VercelBlobStorage(client=self.service)
+
+    def test_fresh_reads_skip_the_network(self):
+        self.storage.set_data('posts', [{'id': 'p', 'timestamp': '2024-01-01'}])
+        self.service.downloads.clear()
+        for _ in range(3):
+            self.assertEqual(self.storage.get_data('posts')[0]['id'], 'p')
+        self.assertEqual(self.service.downloads, [])
+
+    def test_stale_reads_revalidate_with_etag(self):
+        self.storage.set_data('posts', [{'id': 'p', 'timestamp': '2024-01-01'}])
+        self.storage.cache.ttl = 0
+        self.storage.get_data('posts')  # first download learns the ETag
+        self.assertEqual(self.storage.get_data('posts')[0]['id'], 'p')
+        self.assertEqual(self.service.downloads, [('data/posts.json', 200), ('data/posts.json', 304)])
+
+    def test_other_instance_writes_seen_after_revalidation(self):
+        other = VercelBlobStorage(client=self.service)
+        self.storage.set_data('posts', [{'id': 'old', 'timestamp': '2024-01-01'}])
+        self.storage.get_data('posts')
+        other.set_data('posts', [{'id': 'new', 'timestamp': '2024-01-02'}])
+        self.storage.cache.ttl = 0
+        self.assertEqual(self.storage.get_data('posts')[0]['id'], 'new')
+
+    def test_generation_revalidates_without_parsing(self):
+        self.storage.set_data('posts', [{'id': 'p', 'timestamp': '2024-01-01'}])
+        self.storage.get_data('posts')
+        self.storage.cache.ttl = 0
+        with mock.patch('storage_service.json.loads') as loads:
+            first = self.storage.generation('posts')
+            self.assertEqual(self.storage.generation('posts'), first)
+        loads.assert_not_called()
+        self.assertEqual(self.service.downloads[-1], ('data/posts.json', 304))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for serving uploads: Range requests, ETag revalidation and caching
+
+Run with: python -m unittest test_uploaded_files
+"""
+
+import hashlib
+import os
+import unittest
+import uuid
+
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+
+from app import app, storage  # noqa: E402
+
+
+class UploadedFileTest(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.content = bytes(range(256)) * 4
+        self.filename = f'{uuid.uuid4()}.bin'
+        storage.store_file(self.content, self.filename, 'application/octet-stream')
+        self.url = f'/uploads/{self.filename}'
+
+    def test_full_response_is_cacheable(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, self.content)
+        self.assertEqual(response.headers['ETag'], f'"{hashlib.sha256(self.content).hexdigest()}"')
+        self.assertEqual(response.headers['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertIn('Last-Modified', response.headers)
+
+    def test_range_returns_partial_content(self):
+        response = self.client.get(self.url, headers={'Range': 'bytes=10-19'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, self.content[10:20])
+        self.assertEqual(response.headers['Content-Range'], f'bytes 10-19/{len(self.content)}')
+
+        response = self.client.get(self.url, headers={'Range': 'bytes=-4'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, self.content[-4:])
+
+    def test_unsatisfiable_range_returns_416(self):
+        response = self.client.get(self.url, headers={'Range': f'bytes={len(self.content)}-'})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response.headers['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url).headers['ETag']
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': '"other"'}).status_code, 200)
+
+    def test_missing_file_returns_404(self):
+        self.assertEqual(self.client.get('/uploads/missing.bin').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the write-behind view counter
+
+Run with: python -m unittest test_view_counter
+"""
+
+import unittest
+
+from view_counter import ViewCounter
+
+
+class ViewCounterTest(unittest.TestCase):
+    def setUp(self):
+        self.stored = {}
+        self.fail_on = None
+        self.during_flush = None
+        # Long interval: flushes only happen when a test asks for them
+        self.counter = ViewCounter(self.write, interval=3600)
+
+    def write(self, batch):
+        """Flush callback: store counts one video at a time, like the app does"""
+        if self.during_flush:
+            self.during_flush()
+        for video_id, amount in list(batch.items()):
+            if video_id == self.fail_on:
+                raise ConnectionError('storage unavailable')
+            self.stored[video_id] = self.stored.get(video_id, 0) + amount
+            del batch[video_id]
+
+    def test_views_are_coalesced_until_flush(self):
+        for _ in range(3):
+            self.counter.add('a')
+        self.assertEqual(self.counter.add('b', 2), 2)
+        self.assertEqual(self.stored, {})
+        self.assertEqual(self.counter.flush(), 2)
+        self.assertEqual(self.stored, {'a': 3, 'b': 2})
+        self.assertEqual((self.counter.pending('a'), self.counter.pending('b')), (0, 0))
+
+    def test_empty_flush_does_not_write(self):
+        self.during_flush = lambda: self.fail('nothing to flush')
+        self.assertEqual(self.counter.flush(), 0)
+
+    def test_partial_failure_requeues_only_unwritten_counts(self):
+        self.counter.add('a', 2)
+        self.counter.add('b', 5)
+        self.counter.add('c', 1)
+        self.fail_on = 'b'
+        self.assertEqual(self.counter.flush(), 1)
+        self.assertEqual(self.stored, {'a': 2})
+        self.assertEqual((self.counter.pending('a'), self.counter.pending('b'), self.counter.pending('c')),
+                         (0, 5, 1))
+
+        self.fail_on = None
+        self.assertEqual(self.counter.flush(), 2)
+        self.assertEqual(self.stored, {'a': 2, 'b': 5, 'c': 1})
+
+    def test_views_during_flush_stay_pending(self):
+        self.counter.add('a', 4)
+        self.during_flush = lambda: self.counter.add('a')
+        self.counter.flush()
+        self.assertEqual(self.stored, {'a': 4})
+        self.assertEqual(self.counter.pending('a'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
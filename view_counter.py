@@ -0,0 +1,87 @@
+"""
+View Counter for Skibidi Hub
+
+View beacons are the busiest endpoint, so they don't write to storage. Each
+beacon is an O(1) bump of a pending count in memory, and a background thread
+periodically folds the coalesced counts into the stored video records, one
+storage write per viewed video per interval.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """Write-behind aggregator of view counts keyed by video id"""
+
+    def __init__(self, flush: Callable[[Dict[str, int]], None], interval: float = 10.0):
+        """
+        Initialize the aggregator and start its flush thread
+
+        Args:
+            flush: Applies {video_id: views to add} to storage, popping each
+                id from the dict once written so a failure part-way through
+                neither loses nor double-counts views
+            interval: Seconds between flushes
+        """
+        self._flush = flush
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, int] = {}
+        self.flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self.flush_thread.start()
+        # Counts still pending at shutdown would otherwise be lost
+        atexit.register(self.flush)
+
+    def add(self, video_id: str, amount: int = 1) -> int:
+        """Count views of a video, returning its views not yet flushed"""
+        with self._lock:
+            pending = self._pending.get(video_id, 0) + amount
+            self._pending[video_id] = pending
+            return pending
+
+    def pending(self, video_id: str) -> int:
+        """Views of a video not yet flushed to storage"""
+        return self._pending.get(video_id, 0)
+
+    def pending_ids(self) -> List[str]:
+        """Videos with views not yet flushed to storage"""
+        with self._lock:
+            return list(self._pending)
+
+    def flush(self) -> int:
+        """Write pending counts to storage, returning the number of videos updated"""
+        with self._flush_lock:
+            with self._lock:
+                batch = dict(self._pending)
+            if not batch:
+                return 0
+            unwritten = dict(batch)
+            try:
+                self._flush(unwritten)
+            except Exception as e:
+                # Unwritten counts stay pending and are retried next time
+                logger.error(f"Error flushing view counts: {e}")
+            written = {video_id: amount for video_id, amount in batch.items()
+                       if video_id not in unwritten}
+            # Views counted during the flush stay pending for the next one
+            with self._lock:
+                for video_id, amount in written.items():
+                    remaining = self._pending.get(video_id, 0) - amount
+                    if remaining:
+                        self._pending[video_id] = remaining
+                    else:
+                        self._pending.pop(video_id, None)
+            return len(written)
+
+    def _flush_loop(self):
+        """Background thread to flush pending counts periodically"""
+        while True:
+            time.sleep(self.interval)
+            self.flush()
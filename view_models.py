@@ -0,0 +1,67 @@
+"""
+View-Model Projection Layer for Skibidi Hub
+
+Routes render lightweight per-request views built from stored records instead
+of writing computed fields (like counts, comment previews) into the dicts that
+live inside memory storage. Stored records stay proportional to real data, and
+backups never pick up render-only fields.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+from storage_backend import CommentPages, LikeCounts
+from view_counter import ViewCounter
+
+
+class RecordView(Mapping):
+    """Read-only overlay of computed fields on top of a stored record.
+
+    Lookups check the computed fields first and fall back to the record, so
+    templates can use ``post.username`` and ``post.like_count`` alike. The
+    underlying record is never copied or modified.
+    """
+
+    __slots__ = ('_record', '_extra')
+
+    def __init__(self, record: Dict[str, Any], **extra: Any):
+        self._record = record
+        self._extra = extra
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._extra:
+            return self._extra[key]
+        return self._record[key]
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._extra
+        for key in self._record:
+            if key not in self._extra:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._record) + sum(1 for key in self._extra if key not in self._record)
+
+
+def post_view(post: Dict[str, Any], likes: LikeCounts,
+              comments: CommentPages, preview_size: int) -> RecordView:
+    """Project a stored post for the feed with like/comment counts and a comment preview"""
+    return RecordView(post,
+                      like_count=likes.count(post['id']),
+                      comment_count=comments.count(post['id']),
+                      comments_data=comments.newest_first(post['id'])[:preview_size])
+
+
+def video_view(video: Dict[str, Any], likes: LikeCounts, views: ViewCounter) -> RecordView:
+    """Project a stored video for the scrolls feed with its like count and unflushed views"""
+    return RecordView(video,
+                      like_count=likes.count(video['id']),
+                      views=video.get('views', 0) + views.pending(video['id']))